@@ -1,8 +1,58 @@
 import json
+from bisect import bisect_right
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
-
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CHANGELOG_AUTHOR = "HEAT Labs Team"
+
+# Change lists that count towards the version number
+CHANGE_KEYS = ("added", "changed", "fixed", "removed")
+
+# Fields checked and corrected on every update, in report order
+CORRECTED_FIELDS = ("version", "author", "title", "description")
+
+# Version transition configuration
+VERSION_TRANSITIONS = [
+    {"from_version": "0.0.000", "major_version": 0},
+    {
+        "from_version": "0.9.000",
+        "major_version": 1,
+    },
+    {
+        "from_version": "1.9.000",
+        "major_version": 2,
+    },
+]
+
+# Sort transitions by version for processing
+VERSION_TRANSITIONS.sort(key=lambda x: [int(n) for n in x["from_version"].split(".")])
+
+# Parse transition versions once at import instead of on every call
+PARSED_TRANSITIONS = [
+    (tuple(int(n) for n in t["from_version"].split(".")), t["major_version"])
+    for t in VERSION_TRANSITIONS
+]
+TRANSITION_CUMULATIVES = {
+    major_version: (parts[1] * 1000) + parts[2] + 1
+    for parts, major_version in PARSED_TRANSITIONS
+}
+
+# Cumulative change count at which each transition takes effect. Versions are
+# compared as 0.middle.minor, so a transition above major 0 is never reached.
+TRANSITION_BOUNDARIES = [
+    (parts[1] * 1000) + parts[2] + 1 if parts[0] == 0 else float("inf")
+    for parts, _ in PARSED_TRANSITIONS
+]
+TRANSITION_MAJORS = [major_version for _, major_version in PARSED_TRANSITIONS]
+
+
+@lru_cache(maxsize=4096)
 def format_date_long(date_str):
     """Convert date from YYYY-MM-DD to 'DD Month, YYYY'."""
     try:
@@ -12,87 +62,34 @@ def format_date_long(date_str):
         return date_str  # Return as-is if format is invalid
 
 
-def calculate_correct_version_numbers(changelog):
-    updates_chronological = changelog["updates"][::-1]  # Oldest to newest
+def calculate_correct_version_numbers(changelog, author=CHANGELOG_AUTHOR):
+    updates = changelog["updates"]
+    update_count = len(updates)
     cumulative_changes = 0
-    corrected_updates = []
-
-    # Version transition configuration
-    VERSION_TRANSITIONS = [
-        {"from_version": "0.0.000", "major_version": 0},
-        {
-            "from_version": "0.9.000",
-            "major_version": 1,
-        },
-        {
-            "from_version": "1.9.000",
-            "major_version": 2,
-        },
-    ]
-
-    # Sort transitions by version for processing
-    VERSION_TRANSITIONS.sort(
-        key=lambda x: [int(n) for n in x["from_version"].split(".")]
-    )
-
-    for idx, update in enumerate(updates_chronological):
-        # Count each type of change separately
-        additions = len(update.get("added", []))
-        changes = len(update.get("changed", []))
-        fixes = len(update.get("fixed", []))
-        removals = len(update.get("removed", []))
+    corrected_updates = [None] * update_count  # Newest first, like the input
 
+    # Walk oldest to newest without building a reversed copy
+    for idx, update in enumerate(reversed(updates)):
         # Sum all changes for version number calculation
-        total_changes = additions + changes + fixes + removals
-        cumulative_changes += total_changes
+        cumulative_changes += sum(
+            len(update[key]) for key in CHANGE_KEYS if key in update
+        )
 
-        # Determine major version based on transitions
-        current_major_version = 0
+        # Determine major version from the last transition reached
         current_middle_version = 0
         current_minor_version = 0
 
-        # Calculate what the version would be without transitions
-        temp_middle = (cumulative_changes - 1) // 1000
-        temp_minor = (cumulative_changes - 1) % 1000
-        temp_version = f"0.{temp_middle}.{temp_minor:03d}"
-
-        # Find the appropriate major version based on transitions
-        for transition in reversed(VERSION_TRANSITIONS):
-            transition_parts = [int(n) for n in transition["from_version"].split(".")]
-            current_parts = [int(n) for n in temp_version.split(".")]
-
-            # Compare versions: major.middle.minor
-            if (
-                current_parts[0] > transition_parts[0]
-                or (
-                    current_parts[0] == transition_parts[0]
-                    and current_parts[1] > transition_parts[1]
-                )
-                or (
-                    current_parts[0] == transition_parts[0]
-                    and current_parts[1] == transition_parts[1]
-                    and current_parts[2] >= transition_parts[2]
-                )
-            ):
-                current_major_version = transition["major_version"]
-                break
+        transition_index = bisect_right(TRANSITION_BOUNDARIES, cumulative_changes) - 1
+        if transition_index >= 0:
+            current_major_version = TRANSITION_MAJORS[transition_index]
+        else:
+            current_major_version = 0
 
         # Calculate final version numbers
-        base_transition = None
-        for transition in VERSION_TRANSITIONS:
-            if transition["major_version"] == current_major_version:
-                base_transition = transition
-                break
+        transition_cumulative = TRANSITION_CUMULATIVES.get(current_major_version)
 
-        if base_transition:
+        if transition_cumulative is not None:
             # Calculate offset from the transition point
-            transition_parts = [
-                int(n) for n in base_transition["from_version"].split(".")
-            ]
-            transition_cumulative = (
-                (transition_parts[1] * 1000) + transition_parts[2] + 1
-            )
-
             if cumulative_changes >= transition_cumulative:
                 offset = cumulative_changes - transition_cumulative
                 current_middle_version = offset // 1000
@@ -106,76 +103,50 @@ def calculate_correct_version_numbers(changelog):
             current_middle_version = (cumulative_changes - 1) // 1000
             current_minor_version = (cumulative_changes - 1) % 1000
 
-        correct_version = f"{current_major_version}.{current_middle_version}.{current_minor_version:03d}"
-
-        corrected_update = update.copy()
-        corrected_update["version"] = correct_version
+        correct_version = f"{current_major_version}.{current_middle_version}." + str(
+            current_minor_version
+        ).zfill(3)
 
         update_number = idx + 1
         pretty_date = format_date_long(update["date"])
 
-        corrected_update["title"] = f"Update Number #{update_number}"
-        corrected_update["description"] = (
-            f"Full patch notes for Update v{correct_version} "
-            f"(#{update_number}), detailing all changes made on {pretty_date}."
-        )
-
-        corrected_updates.append(corrected_update)
+        # Only the corrected fields are kept, the update itself is not copied
+        corrected_updates[update_count - 1 - idx] = {
+            "version": correct_version,
+            "author": author,
+            "title": f"Update Number #{update_number}",
+            "description": (
+                f"Full patch notes for Update v{correct_version} "
+                f"(#{update_number}), detailing all changes made on {pretty_date}."
+            ),
+        }
 
-    corrected_updates = corrected_updates[::-1]  # Newest first
-    corrected_changelog = changelog.copy()
-    corrected_changelog["updates"] = corrected_updates
-    return corrected_changelog, VERSION_TRANSITIONS
+    return corrected_updates, VERSION_TRANSITIONS
 
 
-def verify_and_correct_changelog(file_path):
-    with open(file_path, "r") as f:
-        changelog = json.load(f)
+def verify_and_correct_changelog(file_path, author=CHANGELOG_AUTHOR):
+    if orjson is not None:
+        changelog = orjson.loads(Path(file_path).read_bytes())
+    else:
+        with open(file_path, "r") as f:
+            changelog = json.load(f)
 
-    corrected_changelog, VERSION_TRANSITIONS = calculate_correct_version_numbers(
-        changelog
+    corrected_updates, VERSION_TRANSITIONS = calculate_correct_version_numbers(
+        changelog, author
     )
 
-    version_issues = False
-    author_issues = False
-    title_issues = False
-    description_issues = False
-
     mismatches = []
 
-    for i, (original, corrected) in enumerate(
-        zip(changelog["updates"], corrected_changelog["updates"])
-    ):
+    for original, corrected in zip(changelog["updates"], corrected_updates):
         update_issues = {}
         update_issues["date"] = original["date"]
 
-        if original["version"] != corrected["version"]:
-            version_issues = True
-            update_issues["version"] = {
-                "current": original["version"],
-                "correct": corrected["version"],
-            }
-
-        if original.get("author") != "HEAT Labs Team":
-            author_issues = True
-            update_issues["author"] = {
-                "current": original.get("author", "MISSING"),
-                "correct": "HEAT Labs Team",
-            }
-
-        if original.get("title") != corrected["title"]:
-            title_issues = True
-            update_issues["title"] = {
-                "current": original.get("title", "MISSING"),
-                "correct": corrected["title"],
-            }
-
-        if original.get("description") != corrected["description"]:
-            description_issues = True
-            update_issues["description"] = {
-                "current": original.get("description", "MISSING"),
-                "correct": corrected["description"],
-            }
+        for field in CORRECTED_FIELDS:
+            if original.get(field) != corrected[field]:
+                update_issues[field] = {
+                    "current": original.get(field, "MISSING"),
+                    "correct": corrected[field],
+                }
 
         if len(update_issues) > 1:
             mismatches.append(update_issues)
@@ -198,11 +169,12 @@ def verify_and_correct_changelog(file_path):
         "\nDo you want to automatically fix and overwrite the changelog? (y/n): "
     )
     if response.lower() == "y":
-        changelog["updates"] = corrected_changelog["updates"]
-
-        for update in changelog["updates"]:
-            update["author"] = "HEAT Labs Team"
+        # Apply corrections directly onto the loaded updates
+        for update, corrected in zip(changelog["updates"], corrected_updates):
+            update.update(corrected)
 
+        # Written with json rather than orjson so the escaping, and with it
+        # the diff in the configs repo, does not depend on what is installed
         with open(file_path, "w") as f:
             json.dump(changelog, f, indent=2)
 
@@ -1,9 +1,13 @@
 import requests
 import json
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timedelta, timezone
 from collections import defaultdict
 from dotenv import load_dotenv
 import os
+from urllib.parse import urlencode
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Load token from ../.env
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "../.env"))
@@ -15,6 +19,19 @@ if not GITHUB_TOKEN:
 # Config
 GITHUB_API_URL = "https://api.github.com"
 ORG_NAME = "HEATLabs"
+MAX_WORKERS = 8
+OUTPUT_PATH = "../../HEAT-Labs-Configs/daily_commits.json"
+
+# Days refetched before today when updating an existing log
+SINCE_OVERLAP_DAYS = 2
+
+# Times one page is retried after a secondary rate limit before giving up
+MAX_RATE_LIMIT_RETRIES = 3
+
+# Conditional request cache, keyed by repo page
+ETAG_CACHE_FILE = os.path.join(os.path.dirname(__file__), ".etag_cache.json")
+COMMITS_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".commits_cache")
+ETAG_CACHE = {}
 REPOS = [
     ".github",
     "HEAT-Labs-Changelog",
@@ -57,38 +74,116 @@ REPOS = [
     "HEAT-Labs-WGC-API-Emulator",
     "HEAT-Labs-Tools",
     "HEAT-Labs-Website",
-    "HEAT-Labs-Website-Development"
+    "HEAT-Labs-Website-Development",
 ]
 
 EXTRA_REPOS = [
     {"owner": "ThatSINEWAVE", "repo": "HEAT-Labs-Views-API"},
 ]
 
-
-def get_all_commits(repo, owner=None):
-    if owner:
-        url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/commits"
-    else:
-        url = f"{GITHUB_API_URL}/repos/{ORG_NAME}/{repo}/commits"
-
-    headers = {
+# Shared session so every page request reuses the same GitHub connection
+SESSION = requests.Session()
+SESSION.headers.update(
+    {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3+json",
     }
+)
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+
+def load_etag_cache():
+    try:
+        with open(ETAG_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return {}
+
+
+def save_etag_cache():
+    with open(ETAG_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(ETAG_CACHE, f, indent=2)
+
+
+def load_daily_log(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return {}
+
+
+def save_daily_log(daily_log, path):
+    # Write to a temp file first so an interrupted run never leaves a partial log
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(daily_log, f, indent=2, ensure_ascii=False)
+
+    os.replace(tmp_path, path)
+
+
+def get_all_commits(repo, owner=None, since=None):
+    owner = owner or ORG_NAME
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/commits"
 
     all_commits = []
+    params = {"per_page": 100}
+    if since:
+        params["since"] = since.strftime("%Y-%m-%dT%H:%M:%SZ")
     page = 1
+    rate_limit_retries = 0
+
+    while url:
+        page_url = f"{url}?{urlencode(params)}" if params else url
+        cache_key = f"{owner}/{repo}/page_{page}"
+        cached = ETAG_CACHE.get(cache_key)
+        page_path = os.path.join(COMMITS_CACHE_DIR, owner, repo, f"page_{page}.json")
+
+        # Ask GitHub to answer 304 if the page is unchanged since the last run
+        headers = {}
+        if cached and cached["url"] == page_url and os.path.exists(page_path):
+            headers["If-None-Match"] = cached["etag"]
 
-    while True:
-        params = {"per_page": 100, "page": page}
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
+        response = SESSION.get(url, params=params, headers=headers)
 
-        page_commits = response.json()
-        if not page_commits:
-            break
+        # Back off and retry the same page when hitting the secondary rate limit,
+        # a limit that keeps coming back fails the repo below instead
+        if (
+            response.status_code == 403
+            and "Retry-After" in response.headers
+            and rate_limit_retries < MAX_RATE_LIMIT_RETRIES
+        ):
+            rate_limit_retries += 1
+            time.sleep(int(response.headers["Retry-After"]))
+            continue
+        rate_limit_retries = 0
+
+        if response.status_code == 304:
+            # Reuse the stored page and its next link
+            with open(page_path, "r", encoding="utf-8") as f:
+                page_commits = json.load(f)
+            next_url = cached.get("next")
+        else:
+            response.raise_for_status()
+            page_commits = response.json()
+
+            # Follow the Link header, it is absent on the last page
+            next_url = response.links.get("next", {}).get("url")
+
+            etag = response.headers.get("ETag")
+            if etag:
+                os.makedirs(os.path.dirname(page_path), exist_ok=True)
+                with open(page_path, "w", encoding="utf-8") as f:
+                    json.dump(page_commits, f)
+                ETAG_CACHE[cache_key] = {
+                    "url": page_url,
+                    "etag": etag,
+                    "next": next_url,
+                }
 
         all_commits.extend(page_commits)
+        url = next_url
+        params = None
         page += 1
 
     return all_commits
@@ -105,56 +200,103 @@ def gather_commits(commits_data):
             repo = repo_data["repo"]
             repo_commits = repo_data["commits"]
 
+        prefix = f"[{repo}] "
+
         for commit in repo_commits:
             if "commit" not in commit:
                 continue
 
-            commit_date = datetime.strptime(
-                commit["commit"]["committer"]["date"], "%Y-%m-%dT%H:%M:%SZ"
-            ).date()
+            # Committer dates are ISO 8601 (YYYY-MM-DDTHH:MM:SSZ), keep the date part
+            commit_date = commit["commit"]["committer"]["date"][:10]
 
             message = commit["commit"]["message"].split("\n")[0]
-            entry = f"[{repo}] {message}"
+            entry = prefix + message
+
+            daily_commits[commit_date].append(entry)
+
+    # Sort descending by date, ISO date keys sort lexicographically
+    return {day: daily_commits[day] for day in sorted(daily_commits, reverse=True)}
+
 
-            daily_commits[commit_date.isoformat()].append(entry)
+def merge_daily_logs(daily_log, existing_log, since_day):
+    # Days from since_day onwards were fully refetched, older days are kept
+    merged = {day: entries for day, entries in existing_log.items() if day < since_day}
+    for day, entries in daily_log.items():
+        if day >= since_day or day not in merged:
+            merged[day] = entries
 
-    # Sort descending by date
-    return dict(sorted(daily_commits.items(), reverse=True))
+    return {day: merged[day] for day in sorted(merged, reverse=True)}
 
 
 def main():
-    all_commits = []
+    results = {}
+    ETAG_CACHE.update(load_etag_cache())
+
+    # With an existing log only the last few days need to be fetched again
+    existing_log = load_daily_log(OUTPUT_PATH)
+    since = None
+    if existing_log:
+        since_day = datetime.now(timezone.utc).date() - timedelta(
+            days=SINCE_OVERLAP_DAYS
+        )
+        since = datetime.combine(since_day, datetime.min.time())
+        print(f"Fetching commits since {since_day.isoformat()}")
+
+    # Fetch all repos concurrently, the work is almost entirely network wait
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(get_all_commits, repo, since=since): repo for repo in REPOS
+        }
+        futures.update(
+            {
+                executor.submit(
+                    get_all_commits,
+                    repo_info["repo"],
+                    owner=repo_info["owner"],
+                    since=since,
+                ): f"{repo_info['owner']}/{repo_info['repo']}"
+                for repo_info in EXTRA_REPOS
+            }
+        )
 
-    for repo in REPOS:
-        try:
-            commits = get_all_commits(repo)
-            all_commits.append((repo, commits))
-            print(f"Fetched {len(commits)} commits from {repo}")
-        except Exception as e:
-            print(f"Error fetching commits from {repo}: {str(e)}")
+        for future in as_completed(futures):
+            repo_name = futures[future]
+            try:
+                commits = future.result()
+                results[repo_name] = commits
+                print(f"Fetched {len(commits)} commits from {repo_name}")
+            except Exception as e:
+                print(f"Error fetching commits from {repo_name}: {str(e)}")
 
-    # Get commits from extra repos
+    # Rebuild the list in config order so the log stays stable between runs
+    all_commits = [(repo, results[repo]) for repo in REPOS if repo in results]
+
+    # Add commits from extra repos
     for repo_info in EXTRA_REPOS:
-        try:
-            commits = get_all_commits(repo_info["repo"], owner=repo_info["owner"])
-            all_commits.append(
-                {
-                    "repo": f"{repo_info['owner']}/{repo_info['repo']}",
-                    "commits": commits,
-                }
-            )
-            print(
-                f"Fetched {len(commits)} commits from {repo_info['owner']}/{repo_info['repo']}"
-            )
-        except Exception as e:
-            print(
-                f"Error fetching commits from {repo_info['owner']}/{repo_info['repo']}: {str(e)}"
-            )
+        repo_name = f"{repo_info['owner']}/{repo_info['repo']}"
+        if repo_name in results:
+            all_commits.append({"repo": repo_name, "commits": results[repo_name]})
+
+    save_etag_cache()
+
+    # Recent days are replaced wholesale, which would drop a failed repo's
+    # entries from them, so leave the log as it is until every fetch succeeds
+    if since is not None and len(results) < len(futures):
+        print("⚠️ Some repos could not be fetched, daily commit log left unchanged")
+        return
 
     daily_log = gather_commits(all_commits)
+    if since is not None:
+        daily_log = merge_daily_logs(
+            daily_log, existing_log, since.strftime("%Y-%m-%d")
+        )
 
-    with open("../../HEAT-Labs-Configs/daily_commits.json", "w", encoding="utf-8") as f:
-        json.dump(daily_log, f, indent=2, ensure_ascii=False)
+    # Historical days rarely change, skip the rewrite if nothing did
+    if daily_log == existing_log:
+        print("✅ Daily commit log is already up to date")
+        return
+
+    save_daily_log(daily_log, OUTPUT_PATH)
 
     print("✅ Daily commit log saved to daily_commits.json")
 
@@ -1,28 +1,269 @@
+import errno
 import json
 import os
+import random
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
+from urllib.parse import quote
 
 try:
-    from google.auth.transport.requests import Request
+    import httplib2
+    import requests
+    from google.auth.transport.requests import AuthorizedSession, Request
+    from google_auth_httplib2 import AuthorizedHttp
     from google.oauth2.credentials import Credentials
     from google_auth_oauthlib.flow import InstalledAppFlow
     from googleapiclient.discovery import build
     from googleapiclient.errors import HttpError
+    from requests.adapters import HTTPAdapter
 except ImportError:
     print("Required Google API libraries not found.")
     print(
-        "Please install them with: pip install google-auth google-auth-oauthlib google-auth-httplib2 google-api-python-client"
+        "Please install them with: pip install google-auth google-auth-oauthlib google-auth-httplib2 google-api-python-client requests"
     )
     sys.exit(1)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Google Search Console API scope
 SCOPES = ["https://www.googleapis.com/auth/webmasters.readonly"]
 
+# OAuth token cached between runs
+TOKEN_FILE = "token.json"
+
 # Target website - HEATLabs GitHub Pages
 TARGET_SITE = "https://heatlabs.net/"
 
+# Prefix every HEAT Labs page URL starts with
+HEATLABS_URL_PREFIX = "https://heatlabs.net"
+
+# Let Search Analytics drop rows outside HEAT Labs before sending them
+HEATLABS_PAGE_FILTER = [
+    {
+        "groupType": "and",
+        "filters": [
+            {
+                "dimension": "page",
+                "operator": "includingRegex",
+                "expression": "^https://heatlabs\\.net",
+            }
+        ],
+    }
+]
+
+# Search Analytics endpoint, queried over a pooled keep-alive session
+SEARCH_ANALYTICS_URL = (
+    "https://searchconsole.googleapis.com/webmasters/v3"
+    "/sites/{site}/searchAnalytics/query"
+)
+
+# Partial response mask, only the row fields copied into the output
+SEARCH_ANALYTICS_FIELDS = "rows(keys,clicks,impressions,ctr,position)"
+
+# Partial response masks for the sites and sitemaps lists
+SITES_FIELDS = "siteEntry/siteUrl"
+SITEMAPS_FIELDS = (
+    "sitemap(path,lastSubmitted,isPending,isSitemapsIndex,type,lastDownloaded,"
+    "warnings,errors)"
+)
+
+# Most URL inspection batches run at once, kept low for the per-minute quota
+INSPECTION_WORKERS = 8
+
+# Inspection batches allowed at once before the limiter has seen any responses
+INSPECTION_INITIAL_CONCURRENCY = 4
+
+# Google accepts at most 100 calls in one batch request
+INSPECTION_BATCH_SIZE = 100
+
+# Partial response mask, only the index status is kept from an inspection
+INSPECTION_FIELDS = "inspectionResult/indexStatusResult"
+
+# Search Analytics pages requested at once after the first page
+PAGINATION_WORKERS = 8
+
+# Fields shared by every page found in Search Analytics, in output order
+PAGE_TEMPLATE = {
+    "url": None,
+    "status": "indexed_and_served",
+    "last_crawled": None,
+    "indexing_state": "INDEXED",
+    "coverage_state": "VALID",
+    "discovery_date": None,
+    "crawl_time": None,
+    "robots_txt_state": "ALLOWED",
+    "user_agent": "DESKTOP",
+    "clicks": 0,
+    "impressions": 0,
+    "ctr": 0,
+    "position": 0,
+}
+
+# Upper bound on Search Analytics result pages fetched for one date range
+MAX_RESULT_PAGES = 50
+
+# Write buffer for the output JSON
+OUTPUT_BUFFER = 1 << 20
+
+# HTTP cache for the sites and sitemaps lists, which rarely change
+HTTP_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".gsc_http_cache")
+
+# Recent days Search Console may still revise, fetched fresh on every run
+SETTLE_DAYS = 3
+
+# Per-page totals for days that have settled, so later runs only query new days
+SETTLED_STATE_FILE = os.path.join(os.path.dirname(__file__), ".gsc_index_state.json")
+
+# Seconds an inspection result is reused before the URL is inspected again
+INSPECTION_CACHE_TTL = 24 * 60 * 60
+
+# Recent URL inspection results, keyed by URL
+INSPECTION_CACHE_FILE = os.path.join(
+    os.path.dirname(__file__), ".gsc_inspection_cache.json"
+)
+
+# HTTP statuses worth retrying, rate limits and transient server errors
+RETRIABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Attempts made for one API call before giving up
+MAX_RETRY_ATTEMPTS = 6
+
+# Longest wait between two attempts, in seconds
+MAX_RETRY_DELAY = 60
+
+
+# Get the status and Retry-After header of a failed API call
+def _error_status(error: Exception):
+    if isinstance(error, HttpError):
+        return error.resp.status, error.resp.get("retry-after")
+    response = getattr(error, "response", None)
+    if response is None:
+        return None, None
+    return response.status_code, response.headers.get("Retry-After")
+
+
+# Call an API request, retrying rate limits and transient server errors with
+# exponential backoff and random jitter so parallel callers do not retry in step
+def _retry(fn, *, max_attempts: int = MAX_RETRY_ATTEMPTS, on_retry=None):
+    for attempt in range(max_attempts):
+        try:
+            return fn()
+        except (HttpError, requests.HTTPError) as e:
+            status, retry_after = _error_status(e)
+            if status not in RETRIABLE_STATUSES or attempt == max_attempts - 1:
+                raise
+            if on_retry is not None:
+                on_retry(status)
+
+            delay = min(MAX_RETRY_DELAY, 2**attempt + random.random())
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            print(f"HTTP {status}, retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+
+# Limit concurrent requests the way TCP limits its window: grow the limit a
+# little after each request that goes through, halve it when throttled
+class AIMDLimiter:
+    def __init__(
+        self,
+        initial: int = INSPECTION_INITIAL_CONCURRENCY,
+        max_limit: int = INSPECTION_WORKERS,
+    ):
+        self.limit = float(min(initial, max_limit))
+        self.max_limit = max_limit
+        self.active = 0
+        self._cond = threading.Condition()
+
+    # Wait until another request fits under the current limit
+    def acquire(self) -> None:
+        with self._cond:
+            while self.active >= int(self.limit):
+                self._cond.wait()
+            self.active += 1
+
+    # Free a slot and adjust the limit by how the request went
+    def release(self, throttled: bool = False) -> None:
+        with self._cond:
+            self.active -= 1
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 0.5)
+            self._cond.notify_all()
+
+
+# Load the saved totals for settled days
+def load_settled_state() -> Dict[str, Any]:
+    try:
+        with open(SETTLED_STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return {}
+
+
+# Save the totals for settled days, replacing the old file only once written
+def save_settled_state(state: Dict[str, Any]) -> None:
+    tmp_file = f"{SETTLED_STATE_FILE}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_file, SETTLED_STATE_FILE)
+
+
+# Load the saved URL inspection results
+def load_inspection_cache() -> Dict[str, Any]:
+    try:
+        with open(INSPECTION_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return {}
+
+
+# Save the URL inspection results, replacing the old file only once written
+def save_inspection_cache(cache: Dict[str, Any]) -> None:
+    tmp_file = f"{INSPECTION_CACHE_FILE}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp_file, INSPECTION_CACHE_FILE)
+
+
+# Get the day after a YYYY-MM-DD date
+def next_day(date: str) -> str:
+    day = datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)
+    return day.strftime("%Y-%m-%d")
+
+
+# Add page metrics to running [clicks, impressions, position * impressions] totals
+def merge_page_totals(totals: Dict[str, List], pages: List[Dict[str, Any]]) -> None:
+    for page in pages:
+        total = totals.setdefault(page["url"], [0, 0, 0.0])
+        total[0] += page["clicks"]
+        total[1] += page["impressions"]
+        total[2] += page["position"] * page["impressions"]
+
+
+# Turn running totals back into page entries, busiest pages first
+def pages_from_totals(totals: Dict[str, List]) -> List[Dict[str, Any]]:
+    pages = []
+    for url, (clicks, impressions, position_sum) in totals.items():
+        page_data = PAGE_TEMPLATE.copy()
+        page_data["url"] = url
+        page_data["clicks"] = clicks
+        page_data["impressions"] = impressions
+        page_data["ctr"] = clicks / impressions if impressions else 0
+        page_data["position"] = position_sum / impressions if impressions else 0
+        pages.append(page_data)
+
+    pages.sort(key=lambda page: (-page["clicks"], -page["impressions"], page["url"]))
+    return pages
+
 
 # Initialize the indexing status checker with credentials
 class HEATLabsIndexingChecker:
@@ -31,23 +272,31 @@ class HEATLabsIndexingChecker:
         self.service = None
         self.creds = None
         self.target_site = TARGET_SITE
+        self._local = threading.local()
+        self.session = None
+        self._saved_token = None
+        self._cached_http_client = None
 
     # Authenticate with Google Search Console API
     def authenticate(self) -> bool:
-        token_file = "token.json"
-
         # Load existing token if available
-        if os.path.exists(token_file):
+        if os.path.exists(TOKEN_FILE):
             try:
-                self.creds = Credentials.from_authorized_user_file(token_file, SCOPES)
+                with open(TOKEN_FILE, "r") as token:
+                    token_json = token.read()
+                self.creds = Credentials.from_authorized_user_info(
+                    json.loads(token_json), SCOPES
+                )
+                self._saved_token = token_json
             except ValueError as e:
                 print(f"Token file is corrupted: {e}")
                 print("Deleting corrupted token file and getting new credentials...")
-                os.remove(token_file)
+                os.remove(TOKEN_FILE)
                 self.creds = None
 
         # If there are no valid credentials, get new ones
-        if not self.creds or not self.creds.valid:
+        creds_valid = self.creds is not None and self.creds.valid
+        if not creds_valid:
             if self.creds and self.creds.expired and self.creds.refresh_token:
                 try:
                     self.creds.refresh(Request())
@@ -60,15 +309,33 @@ class HEATLabsIndexingChecker:
                     return False
 
         # Save credentials for next run
-        try:
-            with open(token_file, "w") as token:
-                token.write(self.creds.to_json())
-        except Exception as e:
-            print(f"Warning: Could not save token: {e}")
+        self._save_token()
 
-        # Build the service
+        # Let google-auth refresh the token on a background thread once it is
+        # close to expiry, rather than blocking a request partway through a run
+        if hasattr(self.creds, "with_non_blocking_refresh"):
+            self.creds.with_non_blocking_refresh()
+
+        # Build the service from the discovery document bundled with the client,
+        # so no discovery request is made before the real work starts
         try:
-            self.service = build("searchconsole", "v1", credentials=self.creds)
+            self.service = build(
+                "searchconsole",
+                "v1",
+                credentials=self.creds,
+                cache_discovery=False,
+                static_discovery=True,
+            )
+
+            # Reuse one connection pool for the paginated analytics queries
+            self.session = AuthorizedSession(self.creds)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            self.session.mount("https://", adapter)
+
+            # Google only gzips API responses when the User-Agent also
+            # mentions gzip, so ask for it on both headers
+            self.session.headers["Accept-Encoding"] = "gzip, deflate"
+            self.session.headers["User-Agent"] += " (gzip)"
             print("Successfully authenticated and built service!")
             return True
         except Exception as e:
@@ -76,6 +343,19 @@ class HEATLabsIndexingChecker:
             self.service = None
             return False
 
+    # Write the token to disk, skipping the write when it has not changed
+    def _save_token(self) -> None:
+        token_json = self.creds.to_json()
+        if token_json == self._saved_token:
+            return
+
+        try:
+            with open(TOKEN_FILE, "w") as token:
+                token.write(token_json)
+            self._saved_token = token_json
+        except Exception as e:
+            print(f"Warning: Could not save token: {e}")
+
     # Get new credentials through OAuth flow
     def _get_new_credentials(self) -> bool:
         if not os.path.exists(self.credentials_file):
@@ -93,44 +373,52 @@ class HEATLabsIndexingChecker:
                 self.creds = flow.run_local_server(port=8080, open_browser=True)
             except Exception as e1:
                 print(f"Failed with port 8080: {e1}")
-                try:
-                    # Try with port 0 (random available port)
-                    self.creds = flow.run_local_server(port=0, open_browser=True)
-                except Exception as e2:
-                    print(f"Failed with random port: {e2}")
-                    # Try manual flow
-                    print("\nTrying manual authorization flow...")
-                    print(
-                        "If the above fails, you may need to update your OAuth redirect URIs."
-                    )
-                    print(
-                        "Go to Google Cloud Console > APIs & Credentials > OAuth 2.0 Client IDs"
-                    )
-                    print("Edit your client ID and add these redirect URIs:")
-                    print("- http://localhost:8080")
-                    print("- http://localhost:8080/")
-                    print("- http://localhost")
-                    print("- http://127.0.0.1:8080")
-                    print("- http://127.0.0.1:8080/")
-
-                    # Manual flow
-                    auth_url, _ = flow.authorization_url(prompt="consent")
-                    print(
-                        f"\nPlease visit this URL to authorize the application:\n{auth_url}"
-                    )
-                    auth_code = input("Enter the authorization code: ")
-                    flow.fetch_token(code=auth_code)
-                    self.creds = flow.credentials
+                # Only a busy port 8080 is worth another port. Anything else,
+                # network errors during the token exchange included, means the
+                # local server ran and another port would fail the same way
+                if isinstance(e1, OSError) and e1.errno == errno.EADDRINUSE:
+                    try:
+                        # Try with port 0 (random available port)
+                        self.creds = flow.run_local_server(port=0, open_browser=True)
+                    except Exception as e2:
+                        print(f"Failed with random port: {e2}")
+                        self._authorize_manually(flow)
+                else:
+                    self._authorize_manually(flow)
 
             return True
         except Exception as e:
             print(f"Error getting new credentials: {e}")
             return False
 
+    # Authorize by pasting the code from the consent page
+    def _authorize_manually(self, flow) -> None:
+        # Try manual flow
+        print("\nTrying manual authorization flow...")
+        print("If the above fails, you may need to update your OAuth redirect URIs.")
+        print("Go to Google Cloud Console > APIs & Credentials > OAuth 2.0 Client IDs")
+        print("Edit your client ID and add these redirect URIs:")
+        print("- http://localhost:8080")
+        print("- http://localhost:8080/")
+        print("- http://localhost")
+        print("- http://127.0.0.1:8080")
+        print("- http://127.0.0.1:8080/")
+
+        # Manual flow
+        auth_url, _ = flow.authorization_url(prompt="consent")
+        print(f"\nPlease visit this URL to authorize the application:\n{auth_url}")
+        auth_code = input("Enter the authorization code: ")
+        flow.fetch_token(code=auth_code)
+        self.creds = flow.credentials
+
     # Verify that HEATLabs Pages are in Search Console properties
     def verify_heatlabs_property(self) -> bool:
         try:
-            sites = self.service.sites().list().execute()
+            sites = _retry(
+                lambda: self.service.sites()
+                .list(fields=SITES_FIELDS)
+                .execute(http=self._cached_http())
+            )
             properties = [site["siteUrl"] for site in sites.get("siteEntry", [])]
 
             print(f"Found properties: {properties}")
@@ -158,18 +446,25 @@ class HEATLabsIndexingChecker:
 
     # Get indexing status specifically for HEAT Labs Pages
     def get_heatlabs_indexing_status(
-        self, start_date: str = None, end_date: str = None
+        self,
+        start_date: str = None,
+        end_date: str = None,
+        incremental: bool = False,
+        full_refresh: bool = False,
+        checked_at: str = None,
     ) -> Dict[str, Any]:
         if not start_date:
             start_date = "2025-05-16"
         if not end_date:
             end_date = datetime.now().strftime("%Y-%m-%d")
+        if not checked_at:
+            checked_at = datetime.now().isoformat()
 
         print(f"Fetching data from {start_date} to {end_date} (all available data)")
 
         indexing_data = {
             "site_url": self.target_site,
-            "last_checked": datetime.now().isoformat(),
+            "last_checked": checked_at,
             "date_range": {"start_date": start_date, "end_date": end_date},
             "pages": [],
             "summary": {
@@ -180,135 +475,273 @@ class HEATLabsIndexingChecker:
             },
         }
 
-        try:
-            # Get search analytics data to find indexed pages
-            all_pages = []
-            start_row = 0
-            row_limit = 1000  # Maximum allowed by API
-
-            while True:
-                request = {
-                    "startDate": start_date,
-                    "endDate": end_date,
-                    "dimensions": ["page"],
-                    "rowLimit": row_limit,
-                    "startRow": start_row,
-                }
+        # The sitemaps list shares nothing with the analytics pages, so fetch
+        # it in the background while paginating
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            sitemaps_future = executor.submit(self._fetch_sitemaps)
 
-                response = (
-                    self.service.searchanalytics()
-                    .query(siteUrl=self.target_site, body=request)
-                    .execute()
-                )
+            try:
+                # Get search analytics data to find indexed pages
+                if incremental:
+                    all_pages = self._fetch_pages_incrementally(
+                        start_date, end_date, full_refresh
+                    )
+                else:
+                    all_pages = self._fetch_pages(start_date, end_date)
+
+                indexing_data["pages"] = all_pages
+                indexing_data["summary"]["indexed_pages"] = len(all_pages)
+                indexing_data["summary"]["total_pages"] = len(all_pages)
 
-                if "rows" not in response or len(response["rows"]) == 0:
-                    break
-
-                # Process this batch of results
-                for row in response["rows"]:
-                    page_url = row["keys"][0]
-
-                    # Only include HEAT Labs URLs
-                    if page_url.startswith("https://heatlabs.net"):
-                        page_data = {
-                            "url": page_url,
-                            "status": "indexed_and_served",
-                            "last_crawled": None,
-                            "indexing_state": "INDEXED",
-                            "coverage_state": "VALID",
-                            "discovery_date": None,
-                            "crawl_time": None,
-                            "robots_txt_state": "ALLOWED",
-                            "user_agent": "DESKTOP",
+                print(f"Total pages found in all-time data: {len(all_pages)}")
+
+                # Get sitemap data
+                indexing_data["sitemaps"] = sitemaps_future.result()
+
+            except (HttpError, requests.RequestException) as e:
+                print(f"Error fetching data for HEAT Labs: {e}")
+                indexing_data["error"] = str(e)
+
+        return indexing_data
+
+    # Fetch the sitemaps submitted for the HEAT Labs property
+    def _fetch_sitemaps(self) -> List[Dict[str, Any]]:
+        try:
+            sitemaps = _retry(
+                lambda: self.service.sitemaps()
+                .list(siteUrl=self.target_site, fields=SITEMAPS_FIELDS)
+                .execute(http=self._cached_http())
+            )
+        except HttpError as e:
+            print(f"Error fetching sitemaps: {e}")
+            return []
+
+        sitemap_list = []
+        for sitemap in sitemaps.get("sitemap", []):
+            sitemap_data = {
+                "path": sitemap.get("path", ""),
+                "last_submitted": sitemap.get("lastSubmitted", ""),
+                "is_pending": sitemap.get("isPending", False),
+                "is_sitemaps_index": sitemap.get("isSitemapsIndex", False),
+                "type": sitemap.get("type", ""),
+                "last_downloaded": sitemap.get("lastDownloaded", ""),
+                "warnings": sitemap.get("warnings", 0),
+                "errors": sitemap.get("errors", 0),
+            }
+            sitemap_list.append(sitemap_data)
+        return sitemap_list
+
+    # Fetch every HEAT Labs page with Search Analytics data in a date range
+    def _fetch_pages(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        all_pages = []
+        start_row = 0
+        row_limit = 1000  # Maximum allowed by API
+        # Probe with a single page, then fetch further pages a wave at a time
+        wave_size = 1
+        finished = False
+
+        with ThreadPoolExecutor(max_workers=PAGINATION_WORKERS) as executor:
+            while not finished:
+                wave = [
+                    {
+                        "startDate": start_date,
+                        "endDate": end_date,
+                        "dimensions": ["page"],
+                        "dimensionFilterGroups": HEATLABS_PAGE_FILTER,
+                        "aggregationType": "byPage",
+                        "rowLimit": row_limit,
+                        "startRow": start_row + offset * row_limit,
+                    }
+                    for offset in range(wave_size)
+                ]
+
+                # Results come back in row order even though they run in parallel
+                for response in executor.map(self._query_search_analytics, wave):
+                    if "rows" not in response or len(response["rows"]) == 0:
+                        finished = True
+                        break
+
+                    # HEATLABS_PAGE_FILTER already limits rows to HEAT Labs
+                    # URLs, so each row only needs copying over the shared fields
+                    all_pages.extend(
+                        {
+                            **PAGE_TEMPLATE,
+                            "url": row["keys"][0],
                             "clicks": row.get("clicks", 0),
                             "impressions": row.get("impressions", 0),
                             "ctr": row.get("ctr", 0),
                             "position": row.get("position", 0),
                         }
-                        all_pages.append(page_data)
-
-                # Check if we got fewer results than requested, meaning we're done
-                if len(response["rows"]) < row_limit:
-                    break
+                        for row in response["rows"]
+                    )
 
-                start_row += row_limit
-                print(f"Fetched {len(all_pages)} pages so far...")
+                    # Fewer results than requested means we're done
+                    if len(response["rows"]) < row_limit:
+                        finished = True
+                        break
 
-            indexing_data["pages"] = all_pages
-            indexing_data["summary"]["indexed_pages"] = len(all_pages)
-            indexing_data["summary"]["total_pages"] = len(all_pages)
+                    print(f"Fetched {len(all_pages)} pages so far...")
 
-            print(f"Total pages found in all-time data: {len(all_pages)}")
+                start_row += wave_size * row_limit
+                wave_size = PAGINATION_WORKERS
 
-            # Get sitemap data
-            try:
-                sitemaps = (
-                    self.service.sitemaps().list(siteUrl=self.target_site).execute()
-                )
-                indexing_data["sitemaps"] = []
-
-                for sitemap in sitemaps.get("sitemap", []):
-                    sitemap_data = {
-                        "path": sitemap.get("path", ""),
-                        "last_submitted": sitemap.get("lastSubmitted", ""),
-                        "is_pending": sitemap.get("isPending", False),
-                        "is_sitemaps_index": sitemap.get("isSitemapsIndex", False),
-                        "type": sitemap.get("type", ""),
-                        "last_downloaded": sitemap.get("lastDownloaded", ""),
-                        "warnings": sitemap.get("warnings", 0),
-                        "errors": sitemap.get("errors", 0),
-                    }
-                    indexing_data["sitemaps"].append(sitemap_data)
-            except HttpError as e:
-                print(f"Error fetching sitemaps: {e}")
-                indexing_data["sitemaps"] = []
+                # Guard against a misconfigured query paging forever
+                remaining = MAX_RESULT_PAGES - start_row // row_limit
+                if not finished and remaining <= 0:
+                    print(
+                        f"Warning: stopped after {MAX_RESULT_PAGES} pages of "
+                        f"results ({len(all_pages)} pages found)"
+                    )
+                    finished = True
+                wave_size = min(wave_size, remaining)
+
+        return all_pages
+
+    # Fetch pages for the whole range, only querying days not already settled
+    # in an earlier run. Search Console keeps revising the most recent days,
+    # so those are fetched fresh every time and never saved.
+    def _fetch_pages_incrementally(
+        self, start_date: str, end_date: str, full_refresh: bool = False
+    ) -> List[Dict[str, Any]]:
+        settled_through = (
+            datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=SETTLE_DAYS)
+        ).strftime("%Y-%m-%d")
+
+        state = {} if full_refresh else load_settled_state()
+        totals = {}
+        fetch_from = start_date
+        if (
+            state.get("site_url") == self.target_site
+            and state.get("start_date") == start_date
+            and state.get("settled_through", "9999") <= settled_through
+        ):
+            totals = state["pages"]
+            fetch_from = next_day(state["settled_through"])
+
+        # Fold days that have settled since the last run into the saved totals
+        if fetch_from <= settled_through:
+            print(f"Fetching settled data from {fetch_from} to {settled_through}")
+            merge_page_totals(totals, self._fetch_pages(fetch_from, settled_through))
+            save_settled_state(
+                {
+                    "site_url": self.target_site,
+                    "start_date": start_date,
+                    "settled_through": settled_through,
+                    "pages": totals,
+                }
+            )
 
-        except HttpError as e:
-            print(f"Error fetching data for HEAT Labs: {e}")
-            indexing_data["error"] = str(e)
+        combined = {url: list(total) for url, total in totals.items()}
+        recent_from = max(start_date, next_day(settled_through))
+        if recent_from <= end_date:
+            print(f"Fetching recent data from {recent_from} to {end_date}")
+            merge_page_totals(combined, self._fetch_pages(recent_from, end_date))
 
-        return indexing_data
+        return pages_from_totals(combined)
 
-    # Inspect specific HEAT Labs URLs for detailed indexing information
-    def inspect_heatlabs_url(self, inspect_url: str) -> Dict[str, Any]:
-        # Ensure the URL is a HEAT Labs URL
-        if not inspect_url.startswith("https://heatlabs.net"):
-            return {
-                "url": inspect_url,
-                "error": "URL is not a HEAT Labs GitHub Pages URL",
-                "verdict": "INVALID_URL",
-            }
+    # Run a Search Analytics query over the shared keep-alive session
+    def _query_search_analytics(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        url = SEARCH_ANALYTICS_URL.format(site=quote(self.target_site, safe=""))
 
-        try:
-            request_body = {"inspectionUrl": inspect_url, "siteUrl": self.target_site}
+        def post():
+            response = self.session.post(
+                url, params={"fields": SEARCH_ANALYTICS_FIELDS}, json=body
+            )
+            response.raise_for_status()
+            return response
+
+        response = _retry(post)
+        return orjson.loads(response.content) if orjson else response.json()
+
+    # Get an authorized HTTP client backed by an on-disk cache, so unchanged
+    # GET responses are revalidated with their ETag instead of re-downloaded
+    def _cached_http(self):
+        if self._cached_http_client is None:
+            self._cached_http_client = AuthorizedHttp(
+                self.creds, http=httplib2.Http(cache=HTTP_CACHE_DIR)
+            )
+        return self._cached_http_client
+
+    # Get an authorized HTTP client for the current thread, since httplib2
+    # connections cannot be shared between threads
+    def _thread_http(self):
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = AuthorizedHttp(self.creds, http=httplib2.Http())
+            self._local.http = http
+        return http
+
+    # Inspect a group of HEAT Labs URLs in a single batched HTTP request,
+    # waiting for a slot from the limiter when one is given
+    def inspect_heatlabs_urls_batch(
+        self, urls: List[str], limiter: Optional[AIMDLimiter] = None
+    ) -> List[Dict[str, Any]]:
+        results = {}
+        throttled = False
+
+        def mark_throttled(status):
+            nonlocal throttled
+            throttled = True
+
+        def collect(request_id, response, exception):
+            url = urls[int(request_id)]
+            if exception is not None:
+                status, _ = _error_status(exception)
+                if status in RETRIABLE_STATUSES:
+                    mark_throttled(status)
+                print(f"Error inspecting URL {url}: {exception}")
+                results[request_id] = {
+                    "url": url,
+                    "error": str(exception),
+                    "verdict": "ERROR",
+                }
+            else:
+                results[request_id] = self._inspection_summary(url, response)
 
-            response = (
+        batch = self.service.new_batch_http_request(callback=collect)
+        for index, url in enumerate(urls):
+            request_body = {"inspectionUrl": url, "siteUrl": self.target_site}
+            inspect_request = (
                 self.service.urlInspection()
                 .index()
-                .inspect(body=request_body)
-                .execute()
+                .inspect(body=request_body, fields=INSPECTION_FIELDS)
             )
+            batch.add(inspect_request, request_id=str(index))
 
-            inspection_result = response.get("inspectionResult", {})
-            index_status = inspection_result.get("indexStatusResult", {})
-
-            return {
-                "url": inspect_url,
-                "verdict": index_status.get("verdict", "UNKNOWN"),
-                "coverage_state": index_status.get("coverageState", "UNKNOWN"),
-                "robotstxt_state": index_status.get("robotsTxtState", "UNKNOWN"),
-                "indexing_state": index_status.get("indexingState", "UNKNOWN"),
-                "last_crawl_time": index_status.get("lastCrawlTime", ""),
-                "page_fetch_state": index_status.get("pageFetchState", "UNKNOWN"),
-                "google_canonical": index_status.get("googleCanonical", ""),
-                "user_canonical": index_status.get("userCanonical", ""),
-                "referring_urls": index_status.get("referringUrls", []),
-                "crawled_as": index_status.get("crawledAs", "UNKNOWN"),
-            }
-
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            _retry(
+                lambda: batch.execute(http=self._thread_http()),
+                on_retry=mark_throttled,
+            )
         except HttpError as e:
-            print(f"Error inspecting URL {inspect_url}: {e}")
-            return {"url": inspect_url, "error": str(e), "verdict": "ERROR"}
+            print(f"Error inspecting batch of {len(urls)} URLs: {e}")
+            return [{"url": url, "error": str(e), "verdict": "ERROR"} for url in urls]
+        finally:
+            if limiter is not None:
+                limiter.release(throttled)
+
+        return [results[str(index)] for index in range(len(urls))]
+
+    # Pick the indexing fields we keep from a URL inspection response
+    def _inspection_summary(self, inspect_url: str, response: Dict) -> Dict[str, Any]:
+        inspection_result = response.get("inspectionResult", {})
+        index_status = inspection_result.get("indexStatusResult", {})
+
+        return {
+            "url": inspect_url,
+            "verdict": index_status.get("verdict", "UNKNOWN"),
+            "coverage_state": index_status.get("coverageState", "UNKNOWN"),
+            "robotstxt_state": index_status.get("robotsTxtState", "UNKNOWN"),
+            "indexing_state": index_status.get("indexingState", "UNKNOWN"),
+            "last_crawl_time": index_status.get("lastCrawlTime", ""),
+            "page_fetch_state": index_status.get("pageFetchState", "UNKNOWN"),
+            "google_canonical": index_status.get("googleCanonical", ""),
+            "user_canonical": index_status.get("userCanonical", ""),
+            "referring_urls": index_status.get("referringUrls", []),
+            "crawled_as": index_status.get("crawledAs", "UNKNOWN"),
+        }
 
     # Run a comprehensive indexing status check for HEAT Labs
     def run_heatlabs_check(
@@ -316,6 +749,7 @@ class HEATLabsIndexingChecker:
         specific_urls: List[str] = None,
         output_file: str = "../../HEAT-Labs-Configs/gsc-index.json",
         all_time: bool = True,
+        full_refresh: bool = False,
     ) -> None:
         print("Starting authentication...")
         if not self.authenticate():
@@ -332,30 +766,81 @@ class HEATLabsIndexingChecker:
 
         print(f"Processing HEAT Labs indexing data for: {self.target_site}")
 
+        # Read the clock once so every timestamp in the report agrees
+        now = datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        now_iso = now.isoformat()
+
         # Get general indexing data
         if all_time:
             print("Fetching ALL-TIME data...")
-            site_data = self.get_heatlabs_indexing_status()
+            site_data = self.get_heatlabs_indexing_status(
+                end_date=today,
+                incremental=True,
+                full_refresh=full_refresh,
+                checked_at=now_iso,
+            )
         else:
             print("Fetching last 30 days data...")
-            start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
-            site_data = self.get_heatlabs_indexing_status(start_date=start_date)
+            start_date = (now - timedelta(days=30)).strftime("%Y-%m-%d")
+            site_data = self.get_heatlabs_indexing_status(
+                start_date=start_date, end_date=today, checked_at=now_iso
+            )
 
         # If specific URLs provided, inspect them individually
         if specific_urls:
-            inspected_urls = []
+            heatlabs_urls = []
             for url in specific_urls:
-                if url.startswith("https://heatlabs.net"):
+                if url.startswith(HEATLABS_URL_PREFIX):
                     print(f"  Inspecting: {url}")
-                    inspection = self.inspect_heatlabs_url(url)
-                    inspected_urls.append(inspection)
+                    heatlabs_urls.append(url)
                 else:
                     print(f"  Skipping non HEAT Labs URL: {url}")
 
-            site_data["individual_inspections"] = inspected_urls
+            # Reuse recent inspections, dropping any that have expired
+            cache = load_inspection_cache()
+            checked_ts = now.timestamp()
+            cache = {
+                url: entry
+                for url, entry in cache.items()
+                if checked_ts - entry["inspected_at"] < INSPECTION_CACHE_TTL
+            }
+            reused = {} if full_refresh else dict(cache)
+            pending = list(
+                dict.fromkeys(url for url in heatlabs_urls if url not in reused)
+            )
+            reused_count = sum(url in reused for url in heatlabs_urls)
+            if reused_count:
+                print(f"Reusing {reused_count} recent inspections")
+
+            # Bundle inspections into batch requests and send the batches
+            # concurrently to overlap their latency, as many at once as the
+            # API keeps accepting without throttling
+            batches = [
+                pending[i : i + INSPECTION_BATCH_SIZE]
+                for i in range(0, len(pending), INSPECTION_BATCH_SIZE)
+            ]
+            limiter = AIMDLimiter()
+            with ThreadPoolExecutor(max_workers=INSPECTION_WORKERS) as executor:
+                for results in executor.map(
+                    lambda batch: self.inspect_heatlabs_urls_batch(batch, limiter),
+                    batches,
+                ):
+                    for result in results:
+                        entry = {"inspected_at": checked_ts, "result": result}
+                        reused[result["url"]] = entry
+                        # Failed inspections are retried on the next run
+                        if "error" not in result:
+                            cache[result["url"]] = entry
+
+            site_data["individual_inspections"] = [
+                reused[url]["result"] for url in heatlabs_urls
+            ]
+            if pending:
+                save_inspection_cache(cache)
 
         all_data = {
-            "generated_at": datetime.now().isoformat(),
+            "generated_at": now_iso,
             "site_url": self.target_site,
             "data_type": "all_time" if all_time else "last_30_days",
             "data": site_data,
@@ -366,10 +851,15 @@ class HEATLabsIndexingChecker:
             },
         }
 
-        # Save to JSON file
+        # Save to JSON file through a temp file, swapped in once complete
         try:
-            with open(output_file, "w", encoding="utf-8") as f:
+            tmp_file = f"{output_file}.tmp"
+            # Written with json rather than orjson, whose float formatting
+            # (1e-5 against 1e-05) would show up as diffs in the configs repo.
+            # json.dump encodes incrementally, streamed through a large buffer
+            with open(tmp_file, "w", encoding="utf-8", buffering=OUTPUT_BUFFER) as f:
                 json.dump(all_data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_file, output_file)
 
             print(f"\nHEAT Labs indexing status data saved to: {output_file}")
             print(f"Data type: {'All-time' if all_time else 'Last 30 days'}")
@@ -392,6 +882,9 @@ class HEATLabsIndexingChecker:
             print(f"Error saving to file: {e}")
             print("Data collected but could not save to file.")
 
+        # Keep a token refreshed during the run for the next one
+        self._save_token()
+
 
 # Help set up OAuth configuration properly
 def setup_oauth_config():
@@ -433,6 +926,11 @@ def main():
         action="store_true",
         help="Get data for last 30 days only (default is all-time data)",
     )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Refetch all data instead of reusing results saved by earlier runs",
+    )
     args = parser.parse_args()
 
     if args.setup:
@@ -451,6 +949,7 @@ def main():
         specific_urls=specific_urls,
         output_file="../../HEAT-Labs-Configs/gsc-index.json",
         all_time=all_time,
+        full_refresh=args.full_refresh,
     )
 
 
@@ -1,15 +1,80 @@
 import os
 import json
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
 import warnings
-import glob
+
+# Use the much faster calamine xlsx reader when it is installed
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+# Encode the output JSON with orjson when it is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Suppress the openpyxl style warnings
 warnings.filterwarnings(
     "ignore", category=UserWarning, module="openpyxl.styles.stylesheet"
 )
 
+# Columns read from each export's Chart sheet, keyed by the output field
+SECTION_COLUMNS = {
+    "breadcrumbs": {"invalid": "Invalid", "valid": "Valid"},
+    "coverage": {
+        "not_indexed": "Not indexed",
+        "indexed": "Indexed",
+        "impressions": "Impressions",
+    },
+    "https": {"non_https_urls": "Non-HTTPS URLs", "https_urls": "HTTPS URLs"},
+    "video_indexing": {
+        "no_video_indexed": "No video indexed",
+        "video_indexed": "Video indexed",
+        "impressions": "Impressions",
+    },
+}
+
+# Engine passed to pd.read_excel, None lets pandas pick openpyxl
+EXCEL_ENGINE = "calamine" if python_calamine is not None else None
+
+# Names used for each export in progress messages
+SECTION_NAMES = {
+    "breadcrumbs": "Breadcrumbs",
+    "coverage": "Coverage",
+    "https": "HTTPS",
+    "video_indexing": "Video Indexing",
+}
+
+
+# Read the values of one export's Chart sheet, keyed by date
+def read_chart_values(file_path, columns):
+    df = pd.read_excel(
+        file_path,
+        sheet_name="Chart",
+        engine=EXCEL_ENGINE,
+        usecols=["Date", *columns.values()],
+    )
+
+    # Keep the date part of each cell, anything unparseable becomes NaT
+    dates = df["Date"].astype(str).str.split(n=1).str[0]
+    dates = pd.to_datetime(dates, format="%Y-%m-%d", errors="coerce")
+
+    # Convert whole columns at once, truncating numbers to ints (string
+    # numbers and floats included, thanks microsoft) and the rest to N/A
+    frame = df[list(columns.values())].apply(pd.to_numeric, errors="coerce")
+    frame = np.trunc(frame).astype("Int64").astype(object)
+    frame = frame.where(frame.notna(), "N/A")
+    frame.columns = list(columns)
+    frame.index = dates.dt.strftime("%Y-%m-%d")
+
+    # Drop rows without a date, later rows win when a date repeats
+    frame = frame[frame.index.notna()]
+    frame = frame[~frame.index.duplicated(keep="last")]
+    return frame.to_dict("index")
+
 
 class GSCDataProcessor:
     def __init__(self, input_folder, output_path):
@@ -17,183 +82,31 @@ class GSCDataProcessor:
         self.output_path = output_path
         self.all_data = {}
 
-    # Safely convert value to int, return None if not possible
-    def safe_int(self, value):
-        if pd.isna(value) or value == "" or value is None:
-            return None
-        try:
-            # Try to convert to float, then to int to handle both string numbers and floats (thanks microsoft)
-            return int(float(value))
-        except (ValueError, TypeError):
-            return None
-
-    # Parse date from various formats
-    def parse_date(self, date_value):
-        if pd.isna(date_value) or date_value is None:
-            return None
-
-        date_str = str(date_value).strip()
-        if " " in date_str:
-            date_str = date_str.split()[0]
-
-        try:
-            # Try parsing as date
-            return datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m-%d")
-        except ValueError:
-            return None
-
-    # Extract date range from all Excel files dynamically
-    def get_date_range_from_files(self):
-        all_dates = set()
-
-        # Look for all Excel files in the input folder
-        excel_files = glob.glob(os.path.join(self.input_folder, "*.xlsx"))
-
-        if not excel_files:
-            print("No Excel files found")
-            # Fallback to hardcoded range if no files found
-            start_date = datetime(2025, 10, 5)
-            end_date = datetime(2025, 11, 7)
+    # Build the complete date range covered by the exports' dates
+    def get_date_range(self, all_dates):
+        if not all_dates:
+            print("No dates found in files, using default range")
+            # Fallback to hardcoded range
+            start_date = "2025-10-05"
+            end_date = "2025-11-07"
         else:
-            print(f"Found {len(excel_files)} Excel files")
-
-            for file_path in excel_files:
-                try:
-                    # Try to look for dates in the 'Chart' page
-                    df = pd.read_excel(file_path, sheet_name="Chart")
-                    if "Date" in df.columns:
-                        for date_val in df["Date"]:
-                            parsed_date = self.parse_date(date_val)
-                            if parsed_date:
-                                all_dates.add(parsed_date)
-                except Exception as e:
-                    print(f"Warning reading {os.path.basename(file_path)}: {e}")
-
-            if not all_dates:
-                print("No dates found in files, using default range")
-                # Fallback to hardcoded range
-                start_date = datetime(2025, 10, 5)
-                end_date = datetime(2025, 11, 7)
-            else:
-                # Convert string dates to datetime objects for sorting
-                date_objects = [datetime.strptime(d, "%Y-%m-%d") for d in all_dates]
-                start_date = min(date_objects)
-                end_date = max(date_objects)
+            # Dates are zero-padded ISO strings, so they sort chronologically
+            start_date = min(all_dates)
+            end_date = max(all_dates)
 
         # Generate complete date range
-        dates = []
-        current_date = start_date
-        while current_date <= end_date:
-            dates.append(current_date.strftime("%Y-%m-%d"))
-            current_date += timedelta(days=1)
+        dates = pd.date_range(start_date, end_date, freq="D")
+        return dates.strftime("%Y-%m-%d").tolist()
 
-        return dates
-
-    # Initialize the data structure with all dates
+    # Initialize the data structure with all dates, every value N/A
     def initialize_data_structure(self, dates):
-        for date in dates:
-            self.all_data[date] = {
-                "breadcrumbs": {"invalid": "N/A", "valid": "N/A"},
-                "coverage": {
-                    "not_indexed": "N/A",
-                    "indexed": "N/A",
-                    "impressions": "N/A",
-                },
-                "https": {"non_https_urls": "N/A", "https_urls": "N/A"},
-                "video_indexing": {
-                    "no_video_indexed": "N/A",
-                    "video_indexed": "N/A",
-                    "impressions": "N/A",
-                },
+        self.all_data = {
+            date: {
+                section: dict.fromkeys(columns, "N/A")
+                for section, columns in SECTION_COLUMNS.items()
             }
-
-    # Process Breadcrumbs file
-    def process_breadcrumbs_file(self, file_path):
-        try:
-            df = pd.read_excel(file_path, sheet_name="Chart")
-            for _, row in df.iterrows():
-                date_str = self.parse_date(row["Date"])
-                if date_str and date_str in self.all_data:
-                    invalid_val = self.safe_int(row["Invalid"])
-                    valid_val = self.safe_int(row["Valid"])
-
-                    self.all_data[date_str]["breadcrumbs"]["invalid"] = (
-                        invalid_val if invalid_val is not None else "N/A"
-                    )
-                    self.all_data[date_str]["breadcrumbs"]["valid"] = (
-                        valid_val if valid_val is not None else "N/A"
-                    )
-            print(f"Processed Breadcrumbs data")
-        except Exception as e:
-            print(f"Error processing Breadcrumbs file: {e}")
-
-    # Process Coverage file
-    def process_coverage_file(self, file_path):
-        try:
-            df = pd.read_excel(file_path, sheet_name="Chart")
-            for _, row in df.iterrows():
-                date_str = self.parse_date(row["Date"])
-                if date_str and date_str in self.all_data:
-                    not_indexed_val = self.safe_int(row["Not indexed"])
-                    indexed_val = self.safe_int(row["Indexed"])
-                    impressions_val = self.safe_int(row["Impressions"])
-
-                    self.all_data[date_str]["coverage"]["not_indexed"] = (
-                        not_indexed_val if not_indexed_val is not None else "N/A"
-                    )
-                    self.all_data[date_str]["coverage"]["indexed"] = (
-                        indexed_val if indexed_val is not None else "N/A"
-                    )
-                    self.all_data[date_str]["coverage"]["impressions"] = (
-                        impressions_val if impressions_val is not None else "N/A"
-                    )
-            print(f"Processed Coverage data")
-        except Exception as e:
-            print(f"Error processing Coverage file: {e}")
-
-    # Process HTTPS file
-    def process_https_file(self, file_path):
-        try:
-            df = pd.read_excel(file_path, sheet_name="Chart")
-            for _, row in df.iterrows():
-                date_str = self.parse_date(row["Date"])
-                if date_str and date_str in self.all_data:
-                    non_https_val = self.safe_int(row["Non-HTTPS URLs"])
-                    https_val = self.safe_int(row["HTTPS URLs"])
-
-                    self.all_data[date_str]["https"]["non_https_urls"] = (
-                        non_https_val if non_https_val is not None else "N/A"
-                    )
-                    self.all_data[date_str]["https"]["https_urls"] = (
-                        https_val if https_val is not None else "N/A"
-                    )
-            print(f"Processed HTTPS data")
-        except Exception as e:
-            print(f"Error processing HTTPS file: {e}")
-
-    # Process video indexing file
-    def process_video_indexing_file(self, file_path):
-        try:
-            df = pd.read_excel(file_path, sheet_name="Chart")
-            for _, row in df.iterrows():
-                date_str = self.parse_date(row["Date"])
-                if date_str and date_str in self.all_data:
-                    no_video_val = self.safe_int(row["No video indexed"])
-                    video_val = self.safe_int(row["Video indexed"])
-                    impressions_val = self.safe_int(row["Impressions"])
-
-                    self.all_data[date_str]["video_indexing"]["no_video_indexed"] = (
-                        no_video_val if no_video_val is not None else "N/A"
-                    )
-                    self.all_data[date_str]["video_indexing"]["video_indexed"] = (
-                        video_val if video_val is not None else "N/A"
-                    )
-                    self.all_data[date_str]["video_indexing"]["impressions"] = (
-                        impressions_val if impressions_val is not None else "N/A"
-                    )
-            print(f"Processed Video Indexing data")
-        except Exception as e:
-            print(f"Error processing Video Indexing file: {e}")
+            for date in dates
+        }
 
     # Find all Excel files
     def find_excel_files(self):
@@ -226,35 +139,62 @@ class GSCDataProcessor:
     def process_all_files(self):
         print("Starting GSC data processing...")
 
-        # Get complete date range dynamically
-        dates = self.get_date_range_from_files()
-        self.initialize_data_structure(dates)
-
-        # Find and process each file
+        # Find each file
         excel_files = self.find_excel_files()
+        if not excel_files:
+            print("No Excel files found")
+        else:
+            print(f"Found {len(excel_files)} Excel files")
 
-        processors = {
-            "breadcrumbs": self.process_breadcrumbs_file,
-            "coverage": self.process_coverage_file,
-            "https": self.process_https_file,
-            "video_indexing": self.process_video_indexing_file,
-        }
-
-        for file_type, processor_func in processors.items():
-            if file_type in excel_files:
-                processor_func(excel_files[file_type])
-            else:
+        # Read every file once, collecting its values by date
+        sections = {}
+        for file_type, columns in SECTION_COLUMNS.items():
+            if file_type not in excel_files:
                 print(f"Skipping {file_type}: file not found")
+                continue
+
+            name = SECTION_NAMES[file_type]
+            try:
+                values = read_chart_values(excel_files[file_type], columns)
+            except Exception as e:
+                print(f"Error processing {name} file: {e}")
+                continue
+            sections[file_type] = values
+
+        # Get complete date range from the dates the files contained
+        all_dates = set()
+        for values in sections.values():
+            all_dates.update(values)
+        dates = self.get_date_range(all_dates)
+        self.initialize_data_structure(dates)
+
+        for file_type, values in sections.items():
+            self.merge_section(file_type, values)
+            print(f"Processed {SECTION_NAMES[file_type]} data")
 
         # Save to JSON
         self.save_to_json()
 
+    # Copy one export's values into the dates being reported
+    def merge_section(self, file_type, values):
+        for date_str, section in values.items():
+            self.all_data[date_str][file_type].update(section)
+
     # Save the processed data to JSON file
     def save_to_json(self):
         try:
             # Create the file
-            with open(self.output_path, "w", encoding="utf-8") as f:
-                json.dump(self.all_data, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                with open(self.output_path, "wb") as f:
+                    f.write(
+                        orjson.dumps(
+                            self.all_data,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+                        )
+                    )
+            else:
+                with open(self.output_path, "w", encoding="utf-8") as f:
+                    json.dump(self.all_data, f, indent=2, ensure_ascii=False)
 
         except Exception as e:
             print(f"Error saving JSON file: {e}")
@@ -1,14 +1,68 @@
+import argparse
+import json
 import os
 import re
+import shutil
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
+# Threads used to list directories while searching for HTML files
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
-def find_html_files(root_dir):
+# Folders that never hold site pages, hidden folders are skipped as well
+EXCLUDE_DIRS = {
+    "node_modules",
+    "__pycache__",
+    "venv",
+    "dist",
+    "build",
+}
+
+# (mtime, size) of files already checked, so unchanged files can be skipped
+CHECKED_CACHE_FILE = os.path.join(os.path.dirname(__file__), ".html_import_cache.json")
+
+
+def scan_directory(path, exclude_dirs):
+    html_files = []
+    subdirs = []
+    try:
+        # DirEntry caches the file type, so no extra stat per entry
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    name = entry.name
+                    if name not in exclude_dirs and not name.startswith("."):
+                        subdirs.append(entry.path)
+                elif entry.name.lower().endswith(".html"):
+                    # Leave symlinks and other special files alone
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            html_files.append(entry.path)
+                    except OSError:
+                        continue
+    except OSError:
+        # Skip unreadable directories like os.walk does
+        pass
+    return html_files, subdirs
+
+
+def find_html_files(root_dir, exclude_dirs=EXCLUDE_DIRS):
     html_files = []
-    for dirpath, dirnames, filenames in os.walk(root_dir):
-        for filename in filenames:
-            if filename.lower().endswith(".html"):
-                html_files.append(os.path.join(dirpath, filename))
-    return html_files
+    # scandir releases the GIL, so directories can be listed in parallel
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        pending = {executor.submit(scan_directory, root_dir, exclude_dirs)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                html_files.extend(files)
+                for subdir in subdirs:
+                    pending.add(executor.submit(scan_directory, subdir, exclude_dirs))
+
+    # Threads finish in any order, so sort by file name for a stable listing
+    return sorted(
+        html_files, key=lambda path: (path.rpartition(os.sep)[2].lower(), path)
+    )
 
 
 def remove_duplicate_links_and_scripts(content):
@@ -48,19 +102,69 @@ def remove_duplicate_links_and_scripts(content):
         css_to_remove + scripts_to_remove, key=lambda x: x[0], reverse=True
     )
 
+    # Collect the kept segments right to left and join once at the end,
+    # rather than rebuilding the whole document for every removal
+    pieces = []
+    pos = len(content)
     for start, end in all_to_remove:
-        before = content[:start]
-        after = content[end:]
+        if end < pos:
+            pieces.append(content[end:pos])
+
+        if start and content[start - 1] == "\n":
+            # Drop one newline from the text that now follows the removed tag
+            for i in range(len(pieces) - 1, -1, -1):
+                if pieces[i]:
+                    if pieces[i][0] == "\n":
+                        pieces[i] = pieces[i][1:]
+                    break
+
+        pos = start
+
+    pieces.append(content[:pos])
+    return "".join(reversed(pieces))
+
+
+def load_checked_cache():
+    try:
+        with open(CHECKED_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return {}
+
+
+def save_checked_cache(cache):
+    with open(CHECKED_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
 
-        before_end_newline = before.endswith("\n") if before else False
-        after_start_newline = after.startswith("\n") if after else False
 
-        if before_end_newline and after_start_newline:
-            after = after[1:]
+def file_signature(file_path):
+    stat = os.stat(file_path)
+    return [stat.st_mtime_ns, stat.st_size]
 
-        content = before + after
 
-    return content
+def write_file_atomically(file_path, content):
+    # Write next to the original and swap it in, so an interrupted run
+    # never leaves a half-written page behind
+    tmp_path = f"{file_path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Persist the rename itself where directories can be opened
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(os.path.dirname(file_path) or ".", os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
 
 
 def process_html_file(file_path):
@@ -71,15 +175,39 @@ def process_html_file(file_path):
     content = remove_duplicate_links_and_scripts(content)
 
     if content != original_content:
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write(content)
+        write_file_atomically(file_path, content)
         return True
 
     return False
 
 
+# Parse command line arguments.
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Remove duplicate stylesheet and script imports from HTML files."
+    )
+    parser.add_argument(
+        "-dir",
+        "--input-dir",
+        dest="input_dir",
+        help="Folder to scan for HTML files (prompted for when omitted)",
+    )
+    parser.add_argument(
+        "--exclude",
+        nargs="*",
+        default=[],
+        help="Extra folder names to skip while scanning",
+    )
+    return parser.parse_args()
+
+
 def main():
-    root_dir = input("Enter the path to folder: ").strip()
+    args = parse_arguments()
+    root_dir = args.input_dir
+
+    # Ask for the folder when none was given, or a bad one was typed at a terminal
+    if root_dir is None or (not os.path.isdir(root_dir) and sys.stdin.isatty()):
+        root_dir = input("Enter the path to folder: ").strip()
 
     if not os.path.exists(root_dir):
         print(f"Error: Directory '{root_dir}' does not exist.")
@@ -87,24 +215,53 @@ def main():
 
     print(f"Scanning for HTML files in: {root_dir}")
 
-    html_files = find_html_files(root_dir)
+    html_files = find_html_files(root_dir, EXCLUDE_DIRS.union(args.exclude))
     print(f"Found {len(html_files)} HTML file(s)")
 
     modified_files = []
+    skipped_count = 0
+    checked_cache = load_checked_cache()
+    # Keep entries from other folders, re-record this folder from scratch
+    root_prefix = os.path.join(os.path.abspath(root_dir), "")
+    new_cache = {
+        path: signature
+        for path, signature in checked_cache.items()
+        if not path.startswith(root_prefix)
+    }
 
     for file_path in html_files:
+        cache_key = os.path.abspath(file_path)
+        try:
+            signature = file_signature(file_path)
+        except OSError as e:
+            print(f"Error processing {file_path}: {e}")
+            continue
+
+        # Files untouched since they were last checked have no new duplicates
+        if checked_cache.get(cache_key) == signature:
+            new_cache[cache_key] = signature
+            skipped_count += 1
+            continue
+
         print(f"Processing: {file_path}")
+        # scandir joins every entry name with os.sep
+        file_name = file_path.rpartition(os.sep)[2]
         try:
             if process_html_file(file_path):
                 modified_files.append(file_path)
-                print(f"Fixed duplicates in: {os.path.basename(file_path)}")
+                print(f"Fixed duplicates in: {file_name}")
+                signature = file_signature(file_path)
             else:
-                print(f"No duplicates found in: {os.path.basename(file_path)}")
+                print(f"No duplicates found in: {file_name}")
+            new_cache[cache_key] = signature
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
 
+    save_checked_cache(new_cache)
+
     print(f"Summary:")
     print(f"Total HTML files scanned: {len(html_files)}")
+    print(f"Unchanged files skipped: {skipped_count}")
     print(f"Files modified: {len(modified_files)}")
 
     if modified_files:
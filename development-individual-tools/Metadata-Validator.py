@@ -1,5 +1,8 @@
 import os
+import shutil
+import struct
 import sys
+import zlib
 from PIL import Image, PngImagePlugin
 from PIL.ExifTags import TAGS
 from pathlib import Path
@@ -17,120 +20,246 @@ EXCLUDED_DIRS = {
 }
 METADATA_KEY = "Source"
 METADATA_TEXT = "Image from HEAT Labs - https://heatlabs.net"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif"}
+OUTPUT_FLUSH_EVERY = 100
+# What Pillow raises for unreadable or unwritable images; UnidentifiedImageError
+# is an OSError, broken plugin data raises SyntaxError or struct.error
+IMAGE_ERRORS = (
+    OSError,
+    ValueError,
+    SyntaxError,
+    struct.error,
+    Image.DecompressionBombError,
+)
+# Damaged EXIF blocks make _getexif raise these on top of IMAGE_ERRORS
+EXIF_ERRORS = (*IMAGE_ERRORS, KeyError, TypeError, IndexError, EOFError)
+# Images sent to a worker process at once, to cut down on IPC round trips
+WORKER_CHUNK_SIZE = 64
 
+# Our tEXt chunk as written to disk, from its length field up to the CRC
+METADATA_CHUNK_PAYLOAD = f"{METADATA_KEY}\0{METADATA_TEXT}".encode("latin-1")
+METADATA_CHUNK = (
+    struct.pack(">I", len(METADATA_CHUNK_PAYLOAD)) + b"tEXt" + METADATA_CHUNK_PAYLOAD
+)
+# Pillow writes text chunks before the image data, so they sit near the start
+METADATA_SCAN_BYTES = 65536
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Chunk types whose data starts with a NUL-terminated keyword
+PNG_TEXT_CHUNK_TYPES = {b"tEXt", b"zTXt", b"iTXt"}
 
-def has_correct_metadata(filepath: Path) -> bool:
-    """Check if a PNG image already has the correct metadata."""
+
+def has_metadata_chunk(filepath: Path) -> bool:
+    """Check the raw bytes of a PNG for our tEXt chunk, without Pillow."""
     try:
-        with Image.open(filepath) as img:
-            if img.format == "PNG":
-                info = img.info
-                return info.get(METADATA_KEY) == METADATA_TEXT
-            elif img.format in ["JPEG", "JPG"]:
-                # Check EXIF data for JPEG images
-                if hasattr(img, "_getexif") and img._getexif():
-                    exif = img._getexif()
-                    for tag_id, value in exif.items():
-                        tag = TAGS.get(tag_id, tag_id)
-                        if tag == "ImageDescription" and value == METADATA_TEXT:
-                            return True
-                return False
-            # For other formats, assume no metadata support
-            return False
-    except Exception:
+        with open(filepath, "rb") as f:
+            return METADATA_CHUNK in f.read(METADATA_SCAN_BYTES)
+    except OSError:
         return False
 
 
-def add_metadata_to_png(filepath: Path):
-    """Add metadata to PNG image."""
+def inject_text_chunk(filepath: Path, key: str, value: str) -> bool:
+    """Add a tEXt chunk to a PNG without re-encoding its image data.
+
+    Any text chunk already using the key is replaced. Returns False if the
+    file already has exactly this chunk, and raises ValueError if the file
+    is not a well-formed PNG.
+    """
+    with open(filepath, "rb") as f:
+        data = f.read()
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG file")
+
+    payload = key.encode("latin-1") + b"\0" + value.encode("latin-1")
+    body = b"tEXt" + payload
+    new_chunk = (
+        struct.pack(">I", len(payload)) + body + struct.pack(">I", zlib.crc32(body))
+    )
+    keyword = key.encode("latin-1") + b"\0"
+
+    # Copy the chunks across, dropping our old text and adding the new
+    # chunk straight after IHDR
+    chunks = [PNG_SIGNATURE]
+    pos = len(PNG_SIGNATURE)
+    chunk_type = None
+    while chunk_type != b"IEND":
+        if pos + 12 > len(data):
+            raise ValueError("truncated PNG file")
+        length, chunk_type = struct.unpack(">I4s", data[pos : pos + 8])
+        end = pos + 12 + length
+        if end > len(data):
+            raise ValueError("truncated PNG file")
+
+        chunk = data[pos:end]
+        if chunk == new_chunk:
+            return False
+        if not (
+            chunk_type in PNG_TEXT_CHUNK_TYPES
+            and data[pos + 8 : pos + 8 + len(keyword)] == keyword
+        ):
+            chunks.append(chunk)
+        if chunk_type == b"IHDR":
+            chunks.append(new_chunk)
+        pos = end
+
+    # Without IHDR the new chunk was never added, let Pillow deal with it
+    if new_chunk not in chunks:
+        raise ValueError("PNG file has no IHDR chunk")
+
+    write_file_atomically(filepath, b"".join(chunks))
+    return True
+
+
+def write_file_atomically(filepath: Path, content: bytes):
+    """Write next to the original and swap it in, so an interrupted run
+    never leaves a half-written image behind."""
+    tmp_path = f"{filepath}.tmp"
     try:
-        with Image.open(filepath) as img:
-            meta = PngImagePlugin.PngInfo()
-            # Preserve existing metadata
-            if hasattr(img, "text"):
-                for key, value in img.text.items():
-                    if key != METADATA_KEY:  # Don't duplicate our metadata
-                        meta.add_text(key, value)
-            meta.add_text(METADATA_KEY, METADATA_TEXT)
-            img.save(filepath, format="PNG", pnginfo=meta)
-        return True
-    except Exception as e:
-        raise e
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        shutil.copymode(filepath, tmp_path)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 
-def add_metadata_to_jpeg(filepath: Path):
-    """Add metadata to JPEG image."""
+def read_exif(img: Image.Image) -> dict:
+    """Read an image's EXIF tags, treating damaged EXIF as none at all."""
+    if not hasattr(img, "_getexif"):
+        return {}
     try:
-        with Image.open(filepath) as img:
-            # For JPEG, we'll add it as EXIF ImageDescription
-            exif_dict = {}
-            if hasattr(img, "_getexif") and img._getexif():
-                exif_dict = img._getexif() or {}
-
-            # Add our metadata as ImageDescription (tag 270)
-            exif_dict[270] = METADATA_TEXT
-
-            # Convert back to EXIF format
-            from PIL.ExifTags import Base
-
-            exif_bytes = img.info.get("exif", b"")
-
-            # Save with updated description in ImageDescription field
-            img.save(
-                filepath,
-                format="JPEG",
-                exif=exif_bytes,
-                description=METADATA_TEXT,
-                quality=95,
-            )
+        return img._getexif() or {}
+    except EXIF_ERRORS:
+        return {}
+
+
+def has_correct_metadata(img: Image.Image) -> bool:
+    """Check if an open image already has the correct metadata."""
+    if img.format == "PNG":
+        info = img.info
+        return info.get(METADATA_KEY) == METADATA_TEXT
+    elif img.format in ["JPEG", "JPG"]:
+        # Check EXIF data for JPEG images
+        for tag_id, value in read_exif(img).items():
+            tag = TAGS.get(tag_id, tag_id)
+            if tag == "ImageDescription" and value == METADATA_TEXT:
+                return True
+        return False
+    # For other formats, assume no metadata support
+    return False
+
+
+def add_metadata_to_png(img: Image.Image, filepath: Path):
+    """Add metadata to an open PNG image and save it over the file."""
+    meta = PngImagePlugin.PngInfo()
+    # Preserve existing metadata
+    if hasattr(img, "text"):
+        for key, value in img.text.items():
+            if key != METADATA_KEY:  # Don't duplicate our metadata
+                meta.add_text(key, value)
+    meta.add_text(METADATA_KEY, METADATA_TEXT)
+    img.save(filepath, format="PNG", pnginfo=meta)
+    return True
+
+
+def add_metadata_to_jpeg(img: Image.Image, filepath: Path):
+    """Add metadata to an open JPEG image and save it over the file."""
+    try:
+        # For JPEG, we'll add it as EXIF ImageDescription
+        exif_dict = read_exif(img)
+
+        # Add our metadata as ImageDescription (tag 270)
+        exif_dict[270] = METADATA_TEXT
+
+        # Convert back to EXIF format
+        exif_bytes = img.info.get("exif", b"")
+
+        # Save with updated description in ImageDescription field
+        img.save(
+            filepath,
+            format="JPEG",
+            exif=exif_bytes,
+            description=METADATA_TEXT,
+            quality=95,
+        )
         return True
-    except Exception as e:
+    except IMAGE_ERRORS as e:
         # If EXIF manipulation fails, try a simpler approach
         try:
-            with Image.open(filepath) as img:
-                img.save(filepath, format="JPEG", quality=95)
+            img.save(filepath, format="JPEG", quality=95)
             return True
-        except:
+        except IMAGE_ERRORS:
             raise e
 
 
-def process_image(filepath: Path):
+def process_image(filepath: str):
     """Process a single image file according to the rules."""
+    filepath = Path(filepath)
+    suffix = filepath.suffix.lower()
     try:
-        relative_path = filepath.relative_to(BASE_IMAGE_DIR)
-
-        # Check if already has correct metadata
-        if has_correct_metadata(filepath):
-            return f"Skipped (already has metadata): {filepath}"
-
-        # Add metadata based on file format
-        if filepath.suffix.lower() == ".png":
-            add_metadata_to_png(filepath)
-            return f"Added metadata to PNG: {filepath}"
-        elif filepath.suffix.lower() in [".jpg", ".jpeg"]:
-            add_metadata_to_jpeg(filepath)
-            return f"Added metadata to JPEG: {filepath}"
-        else:
-            # For other formats (WebP, BMP, GIF), try generic approach
+        if suffix == ".png":
+            # Most PNGs are already tagged, spot that without decoding anything
+            if has_metadata_chunk(filepath):
+                return f"Skipped (already has metadata): {filepath}"
+
+            # Splice the chunk into the file rather than re-encoding the pixels
             try:
-                with Image.open(filepath) as img:
+                if not inject_text_chunk(filepath, METADATA_KEY, METADATA_TEXT):
+                    return f"Skipped (already has metadata): {filepath}"
+                return f"Added metadata to PNG: {filepath}"
+            except ValueError:
+                # Not a plain PNG stream, leave it to Pillow below
+                pass
+
+        # Open the file once for both the metadata check and any rewrite
+        with Image.open(filepath) as img:
+            # Check if already has correct metadata
+            if has_correct_metadata(img):
+                return f"Skipped (already has metadata): {filepath}"
+
+            # Add metadata based on file format
+            if suffix == ".png":
+                add_metadata_to_png(img, filepath)
+                return f"Added metadata to PNG: {filepath}"
+            elif suffix in [".jpg", ".jpeg"]:
+                add_metadata_to_jpeg(img, filepath)
+                return f"Added metadata to JPEG: {filepath}"
+            else:
+                # For other formats (WebP, BMP, GIF), try generic approach
+                try:
                     # Save in same format, some formats may not support metadata
                     img.save(filepath, format=img.format)
-                return f"Processed (limited metadata support): {filepath}"
-            except Exception as e:
-                return f"Skipped (format not supported for metadata): {filepath}"
+                    return f"Processed (limited metadata support): {filepath}"
+                except (*IMAGE_ERRORS, KeyError):
+                    # KeyError when Pillow has no writer for the format
+                    return f"Skipped (format not supported for metadata): {filepath}"
 
     except Exception as e:
+        # Whatever a damaged file provokes is still that one file's error,
+        # raising here would end executor.map and lose the rest of the run
         return f"Error processing {filepath}: {str(e)}"
 
 
 def find_image_files(directory: str):
-    """Find all image files in directory recursively."""
-    image_extensions = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif"}
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if Path(file).suffix.lower() in image_extensions:
-                yield Path(root) / file
+    """Find all image files in directory recursively, as path strings."""
+    stack = [directory]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            # Skip unreadable directories, as os.walk did
+            continue
+        with entries:
+            for entry in entries:
+                # scandir already knows each entry's type, so no extra stat
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in EXCLUDED_DIRS:
+                        stack.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                    yield entry.path
 
 
 def main():
@@ -147,15 +276,21 @@ def main():
     skipped_count = 0
     error_count = 0
 
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = [
-            executor.submit(process_image, img_path)
-            for img_path in find_image_files(BASE_IMAGE_DIR)
-        ]
+    # List every image first, then hand them out in chunks
+    img_paths = list(find_image_files(BASE_IMAGE_DIR))
 
-        for future in concurrent.futures.as_completed(futures):
-            result = future.result()
-            print(result)
+    # Re-encoding holds the GIL in Pillow, so spread files over processes
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        # Write results in blocks rather than flushing stdout for every file
+        pending_output = []
+        for result in executor.map(
+            process_image, img_paths, chunksize=WORKER_CHUNK_SIZE
+        ):
+            pending_output.append(result)
+            if len(pending_output) >= OUTPUT_FLUSH_EVERY:
+                sys.stdout.write("\n".join(pending_output) + "\n")
+                sys.stdout.flush()
+                pending_output.clear()
 
             if "Added metadata" in result:
                 processed_count += 1
@@ -164,6 +299,10 @@ def main():
             elif "Error" in result:
                 error_count += 1
 
+        if pending_output:
+            sys.stdout.write("\n".join(pending_output) + "\n")
+            sys.stdout.flush()
+
     print(f"\nMetadata update complete!")
     print(f"Images processed: {processed_count}")
     print(f"Images skipped: {skipped_count}")
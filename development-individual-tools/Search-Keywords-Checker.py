@@ -1,21 +1,33 @@
 import os
+import sys
 import json
 from urllib.parse import urlparse
 
 
 def find_html_files(root_dir):
     html_files = set()
-    for root, dirs, files in os.walk(root_dir):
-        for file in files:
-            if file.endswith(".html"):
-                # Get relative path from the root directory
-                rel_path = os.path.relpath(os.path.join(root, file), root_dir)
-                # Normalize path separators to forward slashes
-                rel_path = rel_path.replace("\\", "/")
-                # Remove .html extension for comparison with indexed paths
-                if rel_path.endswith(".html"):
-                    rel_path = rel_path[:-5]
-                html_files.add(rel_path)
+    # Every path scandir yields starts with the root and a separator
+    prefix_len = len(os.path.join(root_dir, ""))
+    # Only Windows paths need their separators rewritten
+    fix_separators = os.sep != "/"
+    stack = [root_dir]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".html"):
+                        # Get relative path from the root directory
+                        rel_path = entry.path[prefix_len:]
+                        # Normalize path separators to forward slashes
+                        if fix_separators:
+                            rel_path = rel_path.replace(os.sep, "/")
+                        # Remove .html extension for comparison with indexed paths
+                        html_files.add(sys.intern(rel_path[:-5]))
+        except OSError:
+            # Skip unreadable directories like os.walk does
+            continue
     return html_files
 
 
@@ -23,12 +35,13 @@ def load_json_index(json_file):
     with open(json_file, "r", encoding="utf-8") as f:
         data = json.load(f)
 
+    # Interned on both sides so the set difference mostly compares by identity
     indexed_paths = set()
     for entry in data:
         # Extract the path part from the URL
         parsed = urlparse(entry["path"])
         path = parsed.path.lstrip("/")
-        indexed_paths.add(path)
+        indexed_paths.add(sys.intern(path))
 
     return indexed_paths
 
@@ -1,43 +1,68 @@
+import argparse
+import gzip
 import os
-import xml.etree.ElementTree as ET
+import shutil
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Write buffer for the sitemap so large sites flush in few syscalls
+SITEMAP_BUFFER = 1 << 20
+
+# Template for a single <url> entry in the sitemap
+SITEMAP_URL_TEMPLATE = (
+    "\t<url>\n"
+    "\t\t<loc>%s</loc>\n"
+    "\t\t<lastmod>%s</lastmod>\n"
+    "\t\t<changefreq>%s</changefreq>\n"
+    "\t\t<priority>%s</priority>\n"
+    "\t</url>\n"
+)
+
+# Repositories whose site-data/humans.txt gets the last update date
+HUMANS_TXT_REPOS = (
+    "HEAT-Labs-Changelog",
+    "HEAT-Labs-Configs",
+    "HEAT-Labs-Database",
+    "HEAT-Labs-Discord",
+    "HEAT-Labs-Discord-Bot",
+    "HEAT-Labs-Mobile-App",
+    "HEAT-Labs-Images",
+    "HEAT-Labs-Images-Blogs",
+    "HEAT-Labs-Images-Features",
+    "HEAT-Labs-Images-Gallery",
+    "HEAT-Labs-Images-Guides",
+    "HEAT-Labs-Images-Maps",
+    "HEAT-Labs-Images-News",
+    "HEAT-Labs-Images-Tanks",
+    "HEAT-Labs-Images-Tournaments",
+    "HEAT-Labs-Games",
+    "HEAT-Labs-Tank-Game",
+    "HEAT-Labs-Steam-Assets",
+    "HEAT-Labs-Models",
+    "HEAT-Labs-Search",
+    "HEAT-Labs-Mods",
+    "HEAT-Labs-Archives",
+    "HEAT-Labs-Socials",
+    "HEAT-Labs-Sounds",
+    "HEAT-Labs-Static",
+    "HEAT-Labs-Statistics",
+    "HEAT-Labs-Status",
+    "HEAT-Labs-Videos",
+    "HEAT-Labs-Views-API",
+    "HEAT-Labs-Website",
+    "HEAT-Labs-Website-Development",
+)
+
 
 def update_humans_txt_files():
     # humans.txt files
     humans_txt_paths = [
-        Path("../../HEAT-Labs-Changelog/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Configs/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Database/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Discord/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Discord-Bot/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Mobile-App/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Images/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Images-Blogs/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Images-Features/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Images-Gallery/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Images-Guides/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Images-Maps/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Images-News/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Images-Tanks/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Images-Tournaments/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Games/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Tank-Game/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Steam-Assets/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Models/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Search/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Mods/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Archives/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Socials/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Sounds/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Static/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Statistics/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Status/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Videos/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Views-API/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Website/site-data/humans.txt"),
-        Path("../../HEAT-Labs-Website-Development/site-data/humans.txt"),
+        Path("../..", repo, "site-data", "humans.txt") for repo in HUMANS_TXT_REPOS
     ]
 
     # Get current date in the required format
@@ -77,13 +102,41 @@ def update_humans_txt_files():
         updated_count += 1
 
 
-def generate_sitemap():
+def iter_sitemap_lines(url_data):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset\n\txmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+
+    # Format each URL entry properly
+    for data in url_data:
+        yield SITEMAP_URL_TEMPLATE % (
+            data["loc"],
+            data["lastmod"],
+            data["changefreq"],
+            data["priority"],
+        )
+
+    yield "</urlset>"
+
+
+def write_compressed_copies(path):
+    # Pre-compressed copies let the host serve fewer bytes for the sitemap
+    with open(path, "rb") as src, gzip.open(f"{path}.gz", "wb", compresslevel=9) as dst:
+        shutil.copyfileobj(src, dst, length=SITEMAP_BUFFER)
+    print(f"Compressed sitemap written to {path}.gz")
+
+    if brotli:
+        with open(path, "rb") as src, open(f"{path}.br", "wb") as dst:
+            dst.write(brotli.compress(src.read(), quality=11))
+        print(f"Compressed sitemap written to {path}.br")
+
+
+def generate_sitemap(compress=False):
     # Define paths
     base_dir = Path("../../HEAT-Labs-Website")
     sitemap_path = Path("../../HEAT-Labs-Website/site-data/sitemap.xml")
 
-    # Define files to exclude from sitemap
-    not_include = [
+    # Define files to exclude from sitemap, as a set for constant-time lookups
+    not_include = {
         "index.html",
         "placeholder_post.html",
         "maintenance.html",
@@ -110,7 +163,7 @@ def generate_sitemap():
         "placeholder-blog-post.html",
         "placeholder-announcement.html",
         "placeholder-agent.html",
-    ]
+    }
 
     # Check if base directory exists
     if not base_dir.exists():
@@ -120,10 +173,6 @@ def generate_sitemap():
     # Get current date in the required format
     current_date = datetime.now().strftime("%Y-%m-%d")
 
-    # Create the root element for the sitemap
-    urlset = ET.Element("urlset")
-    urlset.set("xmlns", "http://www.sitemaps.org/schemas/sitemap/0.9")
-
     # Find all HTML files in the base directory and subdirectories
     html_files = list(base_dir.rglob("*.html"))
 
@@ -145,7 +194,7 @@ def generate_sitemap():
         if "sitemap.xml" in str(html_file):
             continue
 
-        # Skip files in the not_include list
+        # Skip files in the not_include set
         if html_file.name in not_include:
             print(f"Skipping excluded file: {html_file.name}")
             continue
@@ -168,18 +217,8 @@ def generate_sitemap():
         else:
             priority = "0.2"
 
-        # Build the URL
-        if depth == 0:
-            # File is in root directory
-            url_loc = f"https://heatlabs.net/{html_file.stem}"
-        else:
-            # File is in a subdirectory
-            path_parts = list(relative_path.parts)
-            # Remove .html from the filename
-            filename_without_ext = Path(path_parts[-1]).stem
-            path_parts[-1] = filename_without_ext
-            url_path = "/".join(path_parts)
-            url_loc = f"https://heatlabs.net/{url_path}"
+        # Build the URL from the relative path without the .html extension
+        url_loc = f"https://heatlabs.net/{relative_path.with_suffix('').as_posix()}"
 
         # Store URL data for sorting
         url_data.append(
@@ -196,39 +235,15 @@ def generate_sitemap():
     # Sort URLs first by depth then alphabetically by path
     url_data.sort(key=lambda x: (x["depth"], x["sort_key"] if "sort_key" in x else ""))
 
-    # Add sorted URLs to the XML
-    for data in url_data:
-        url_elem = ET.SubElement(urlset, "url")
-        ET.SubElement(url_elem, "loc").text = data["loc"]
-        ET.SubElement(url_elem, "lastmod").text = data["lastmod"]
-        ET.SubElement(url_elem, "changefreq").text = data["changefreq"]
-        ET.SubElement(url_elem, "priority").text = data["priority"]
-
     # Create the site-data directory if it doesnt exist
     sitemap_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Write the sitemap to file
-    with open(sitemap_path, "w", encoding="utf-8") as f:
-        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-        f.write('<urlset\n\txmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
-
-        # Format each URL entry properly
-        for url_elem in urlset:
-            f.write("\t<url>\n")
-            for child in url_elem:
-                tag = child.tag
-                text = child.text
-                if tag == "loc":
-                    f.write(f"\t\t<loc>{text}</loc>\n")
-                elif tag == "lastmod":
-                    f.write(f"\t\t<lastmod>{text}</lastmod>\n")
-                elif tag == "changefreq":
-                    f.write(f"\t\t<changefreq>{text}</changefreq>\n")
-                elif tag == "priority":
-                    f.write(f"\t\t<priority>{text}</priority>\n")
-            f.write("\t</url>\n")
-
-        f.write("</urlset>")
+    # Stream the sitemap to file entry by entry
+    with open(sitemap_path, "w", encoding="utf-8", buffering=SITEMAP_BUFFER) as f:
+        f.writelines(iter_sitemap_lines(url_data))
+
+    if compress:
+        write_compressed_copies(sitemap_path)
 
     print(f"Found {len(html_files)} HTML files")
     excluded_count = len(not_include)
@@ -239,6 +254,20 @@ def generate_sitemap():
     print(f"Sitemap successfully updated at {sitemap_path}")
 
 
+# Parse command line arguments.
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Update the HEAT Labs sitemap and humans.txt files."
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Also write gzip (and brotli, if installed) copies of sitemap.xml",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    generate_sitemap()
+    args = parse_arguments()
+    generate_sitemap(compress=args.compress)
     update_humans_txt_files()
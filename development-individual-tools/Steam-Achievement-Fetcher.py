@@ -3,7 +3,15 @@ import json
 import requests
 from pathlib import Path
 from dotenv import load_dotenv
-from datetime import datetime
+from datetime import datetime, timezone
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Returned by fetch_steam_achievements when Steam answers 304 Not Modified
+NOT_MODIFIED = object()
 
 
 # Load .env file
@@ -22,21 +30,56 @@ def load_config():
     return steam_key, steam_app_id
 
 
+# Load cached ETag / Last-Modified validators from the sidecar file
+def load_http_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return {}
+
+
+# Save ETag / Last-Modified validators to the sidecar file
+def save_http_cache(cache, cache_path):
+    try:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+    except IOError as e:
+        print(f"Error writing cache file {cache_path}: {e}")
+
+
 # Fetch achievements from Steam API
-def fetch_steam_achievements(steam_key, steam_app_id):
+def fetch_steam_achievements(steam_key, steam_app_id, cache=None):
     url = f"https://api.steampowered.com/ISteamUserStats/GetSchemaForGame/v2/"
     params = {"key": steam_key, "appid": steam_app_id}
 
+    # Send conditional request headers if we have validators from a previous run
+    headers = {}
+    if cache:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
     try:
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, headers=headers)
+        if response.status_code == 304:
+            return NOT_MODIFIED
+
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content) if orjson else response.json()
 
         if "game" not in data or "availableGameStats" not in data["game"]:
             print(f"No achievements found for app ID: {steam_app_id}")
             return None
 
         achievements = data["game"]["availableGameStats"].get("achievements", [])
+
+        # Remember validators for the next conditional request
+        if cache is not None:
+            cache["etag"] = response.headers.get("ETag")
+            cache["last_modified"] = response.headers.get("Last-Modified")
+
         return achievements
 
     except requests.exceptions.RequestException as e:
@@ -52,21 +95,34 @@ def update_achievements_file(achievements_data, output_path):
     try:
         # Create structure
         updated_data = {
-            "last_updated": datetime.utcnow().isoformat() + "Z",
+            "last_updated": datetime.now(timezone.utc),
             "achievements": achievements_data,
         }
 
-        # Write to file
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(updated_data, f, indent=2, ensure_ascii=False)
+        # Write to file, using orjson when available
+        if orjson is not None:
+            with open(output_path, "wb") as f:
+                f.write(
+                    orjson.dumps(
+                        updated_data, option=orjson.OPT_INDENT_2 | orjson.OPT_UTC_Z
+                    )
+                )
+        else:
+            updated_data["last_updated"] = (
+                updated_data["last_updated"].isoformat().replace("+00:00", "Z")
+            )
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(updated_data, f, indent=2, ensure_ascii=False)
 
         print(f"Successfully updated {output_path}")
         print(f"Total achievements: {len(achievements_data)}")
+        return True
 
     except IOError as e:
         print(f"Error writing to file {output_path}: {e}")
     except Exception as e:
         print(f"Error updating achievements file: {e}")
+    return False
 
 
 def main():
@@ -74,22 +130,31 @@ def main():
         Path(__file__).parent
         / "../../HEAT-Labs-Database/game-data/steam_achievements.json"
     )
+    CACHE_PATH = OUTPUT_PATH.with_suffix(".cache.json")
 
     try:
         # Load Steam API key and game ID
         steam_key, steam_app_id = load_config()
         print(f"Using Steam App ID: {steam_app_id}")
 
+        # Only reuse cached validators if the output file is still there
+        cache = load_http_cache(CACHE_PATH) if OUTPUT_PATH.exists() else {}
+
         # Fetch achievements from Steam API
         print("Fetching achievements from Steam API...")
-        achievements = fetch_steam_achievements(steam_key, steam_app_id)
+        achievements = fetch_steam_achievements(steam_key, steam_app_id, cache)
+
+        if achievements is NOT_MODIFIED:
+            print(f"Achievements not modified, {OUTPUT_PATH} is up to date")
+            return
 
         if achievements is None:
             print("Failed to fetch achievements")
             return
 
-        # Update achievements file
-        update_achievements_file(achievements, OUTPUT_PATH)
+        # Update achievements file and cache validators
+        if update_achievements_file(achievements, OUTPUT_PATH):
+            save_http_cache(cache, CACHE_PATH)
 
     except ValueError as e:
         print(f"Configuration error: {e}")
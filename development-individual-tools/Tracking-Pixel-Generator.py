@@ -241,10 +241,7 @@ def process_html_files():
 
     # Compare against all HTML files to find any completely missed files
     processed_files = {p["html_file"] for p in tracking_data["pixels"]}
-    all_html_files = {
-        str(f.relative_to(website_path).as_posix())
-        for f in website_path.rglob("*.html")
-    }
+    all_html_files = {str(f.relative_to(website_path).as_posix()) for f in html_files}
     missing_files = (
         all_html_files
         - processed_files
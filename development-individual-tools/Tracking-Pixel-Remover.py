@@ -1,21 +1,21 @@
 import os
 import re
 
+# Tracking pixel pattern
+TRACKING_PIXEL_PATTERN = re.compile(
+    r"<!-- JsDelivr-based Tracking Pixel -->\s*"
+    r'<img src="https://cdn\.jsdelivr\.net/gh/HEATLabs/HEAT-Labs-Images@refs/heads/main/trackers/pcwstats-tracker-pixel-[a-zA-Z0-9-]+\.png" alt="HEAT Labs Tracking View Counter" style="position:absolute;width:1px;height:1px;opacity:0;pointer-events:none;" class="heatlabs-tracking-pixel" data-page="[a-zA-Z0-9-]+">\s*',
+    re.IGNORECASE,
+)
 
-def remove_tracking_pixel(file_path):
-    # Tracking pixel pattern
-    tracking_pixel_pattern = re.compile(
-        r"<!-- JsDelivr-based Tracking Pixel -->\s*"
-        r'<img src="https://cdn\.jsdelivr\.net/gh/HEATLabs/HEAT-Labs-Images@refs/heads/main/trackers/pcwstats-tracker-pixel-[a-zA-Z0-9-]+\.png" alt="HEAT Labs Tracking View Counter" style="position:absolute;width:1px;height:1px;opacity:0;pointer-events:none;" class="heatlabs-tracking-pixel" data-page="[a-zA-Z0-9-]+">\s*',
-        re.IGNORECASE,
-    )
 
+def remove_tracking_pixel(file_path):
     try:
         with open(file_path, "r", encoding="utf-8") as file:
             content = file.read()
 
         # Remove all instances of the tracking pixel
-        new_content = tracking_pixel_pattern.sub("", content)
+        new_content = TRACKING_PIXEL_PATTERN.sub("", content)
 
         # Only write if content changed
         if new_content != content: